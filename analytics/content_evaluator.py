@@ -3,11 +3,14 @@
 评估文章的质量、原创性、技术深度、可读性等指标
 """
 
+import os
 import re
-import math
-from collections import Counter, defaultdict
-from typing import Dict, List, Set, Tuple, Optional, Any
-from dataclasses import dataclass
+import hashlib
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Set, Tuple, Optional, Any
+from dataclasses import dataclass, replace
 from datetime import datetime
 
 from storage.database import DatabaseManager
@@ -26,6 +29,28 @@ class QualityMetrics:
     completeness_score: float
 
 
+@dataclass
+class ContentFeatures:
+    """文章内容特征（单次预处理结果）"""
+    title: str
+    content: str
+    content_lower: str  # 正文的小写文本
+    text_lower: str  # 标题+正文的小写文本
+    sentences: List[str]  # 正文按句号等切分的原始句子
+    clean_sentence_count: int  # 去除代码和特殊符号后的非空句子数
+    chinese_char_count: int
+    english_word_count: int
+    code_block_count: int
+    inline_code_count: int
+    image_count: int
+    url_count: int
+    question_count: int
+    structure_element_count: int  # 加权后的结构化元素数
+    headers: List[str]  # 要点候选：Markdown 标题
+    list_items: List[str]  # 要点候选：列表项
+    key_point_limit: int  # 预取的要点候选上限（标题、列表项各取前若干个）
+
+
 @dataclass
 class ContentAnalysis:
     """内容分析结果"""
@@ -38,11 +63,81 @@ class ContentAnalysis:
     quality_grade: str  # A, B, C, D
 
 
+# 汇总统计的指标顺序（与批量评估返回的 average_metrics 一致）
+_METRIC_NAMES = (
+    "overall", "originality", "technical_depth", "readability",
+    "structure", "engagement", "completeness"
+)
+
+# 批量评估返回的预览结果数
+_PREVIEW_LIMIT = 50
+
+# 评估结果缓存（按标题+正文哈希），跨评估器实例和批量评估复用
+_ANALYSIS_CACHE_SIZE = 4096
+_analysis_cache: "OrderedDict[bytes, ContentAnalysis]" = OrderedDict()
+
+# 文章数达到该阈值时才启用多进程评估（进程池启动有固定开销）
+_PARALLEL_MIN_ARTICLES = 200
+_PARALLEL_CHUNK_SIZE = 64
+
+# 从数据库分批读取与评估的文章数
+_STREAM_BATCH_SIZE = 1024
+
+# 子进程内复用的评估器（不连接数据库）
+_worker_evaluator: Optional["ContentEvaluator"] = None
+
+
+def _analysis_cache_key(title: str, content: str) -> bytes:
+    """计算评估结果缓存键"""
+    return hashlib.blake2b(f"{title}\x00{content}".encode('utf-8'), digest_size=16).digest()
+
+
+def _copy_analysis(analysis: "ContentAnalysis", article_id: Optional[str] = None) -> "ContentAnalysis":
+    """复制评估结果（含指标和列表字段），使缓存条目不与调用方共享可变对象"""
+    return replace(
+        analysis,
+        article_id=analysis.article_id if article_id is None else article_id,
+        quality_metrics=replace(analysis.quality_metrics),
+        key_points=list(analysis.key_points),
+        improvement_suggestions=list(analysis.improvement_suggestions)
+    )
+
+
+def _cache_analysis(cache_key: bytes, analysis: "ContentAnalysis"):
+    """写入评估结果缓存（保存副本），超出容量时淘汰最久未使用的条目"""
+    _analysis_cache[cache_key] = _copy_analysis(analysis)
+    _analysis_cache.move_to_end(cache_key)
+    if len(_analysis_cache) > _ANALYSIS_CACHE_SIZE:
+        _analysis_cache.popitem(last=False)
+
+
+def _evaluate_article_worker(article: Dict[str, Any]) -> Tuple[Optional["ContentAnalysis"], Optional[str]]:
+    """进程池任务：评估单篇文章，返回 (评估结果, 错误信息)"""
+    global _worker_evaluator
+    if _worker_evaluator is None:
+        _worker_evaluator = ContentEvaluator(connect_db=False)
+    
+    try:
+        return _worker_evaluator.evaluate_article_quality(article), None
+    except Exception as e:
+        return None, str(e)
+
+
 class ContentEvaluator:
     """内容质量评估器"""
     
-    def __init__(self, use_mongodb: bool = False):
-        self.db = DatabaseManager(use_mongodb=use_mongodb)
+    # 综合评分权重
+    SCORE_WEIGHTS = {
+        'technical_depth': 0.25,
+        'originality': 0.20,
+        'completeness': 0.20,
+        'readability': 0.15,
+        'structure': 0.15,
+        'engagement': 0.05
+    }
+    
+    def __init__(self, use_mongodb: bool = False, connect_db: bool = True):
+        self.db = DatabaseManager(use_mongodb=use_mongodb) if connect_db else None
         self.initialize_evaluation_criteria()
     
     def initialize_evaluation_criteria(self):
@@ -68,15 +163,16 @@ class ContentEvaluator:
             ]
         }
         
-        # 结构化内容指示词
+        # 结构化内容指示词 (模式, 权重)
+        # 标题和数字列表用占有量词并要求从连续 #/数字 的开头匹配，避免在长串上反复回溯
         self.structure_indicators = [
-            r'#+\s+',  # Markdown 标题
-            r'\d+\.\s+',  # 数字列表
-            r'[-*]\s+',  # 无序列表
-            r'```[\s\S]*?```',  # 代码块
-            r'`[^`]+`',  # 内联代码
-            r'\[.*?\]\(.*?\)',  # 链接
-            r'!\[.*?\]\(.*?\)',  # 图片
+            (r'(?<!#)#++\s+', 2),  # Markdown 标题，权重更高
+            (r'(?<!\d)\d++\.\s+', 1),  # 数字列表
+            (r'[-*]\s+', 1),  # 无序列表
+            (r'```[\s\S]*?```', 1),  # 代码块
+            (r'`[^`]+`', 1),  # 内联代码
+            (r'\[.*?\]\(.*?\)', 1),  # 链接
+            (r'!\[.*?\]\(.*?\)', 1),  # 图片
         ]
         
         # 原创性关键词（通常表明是转载或引用）
@@ -92,33 +188,127 @@ class ContentEvaluator:
             '留言', '评论', '分享', '点赞', 'what do you think',
             'let me know', 'share your thoughts', 'comment below'
         ]
+        
+        # 结论关键词
+        self.conclusion_indicators = ['conclusion', 'summary', '总结', '结论', '小结']
+        
+        # 预先展开并小写化的指示词表，评分时只做一轮子串扫描
+        # 技术深度级别下标：0=high, 1=medium, 2=low
+        self._technical_level_index = {"high": 0, "medium": 1, "low": 2}
+        self._technical_terms = tuple(
+            (indicator.lower(), self._technical_level_index[level])
+            for level, indicators in self.technical_indicators.items()
+            for indicator in indicators
+        )
+        self._non_original_terms = tuple(self.non_original_indicators)
+        self._engagement_terms = tuple(indicator.lower() for indicator in self.engagement_indicators)
+        self._conclusion_terms = tuple(self.conclusion_indicators)
+        self._key_point_terms = ('api', 'framework', 'library', 'algorithm', '算法', '框架', '接口')
+        
+        # 综合评分权重按计算顺序展开为元组，评估时直接解包
+        self._score_weights = tuple(
+            self.SCORE_WEIGHTS[name]
+            for name in ('technical_depth', 'originality', 'completeness', 'readability', 'structure', 'engagement')
+        )
+        
+        # 预编译正则表达式，避免每次评分时重复查找/编译
+        self._re_code_block = re.compile(r'```[\s\S]*?```')
+        self._re_inline = re.compile(r'`[^`]+`')
+        self._re_non_text = re.compile(r'[^\u4e00-\u9fff\w\s.,!?;:]')
+        self._re_sentence = re.compile(r'[.!?。！？]')
+        self._re_chinese = re.compile(r'[\u4e00-\u9fff]')
+        self._re_en_word = re.compile(r'\b[a-zA-Z]+\b')
+        self._re_header = re.compile(r'#+\s+(.+)')
+        self._re_list = re.compile(r'(?:[-*]\s+|^\d+\.\s+)(.+)', re.MULTILINE)
+        self._re_url = re.compile(r'https?://[^\s]+')
+        self._re_non_word = re.compile(r'[\W_]+')
+        self._re_image = re.compile(r'!\[.*?\]\(.*?\)')
+        self._re_structure = [
+            (re.compile(pattern), weight)
+            for pattern, weight in self.structure_indicators
+        ]
+    
+    def _analyze_content(self, title: str, content: str, max_key_points: int = 5) -> ContentFeatures:
+        """对文章内容做一次预处理，提取各评分函数共享的特征"""
+        code_block_count = len(self._re_code_block.findall(content))
+        inline_code_count = len(self._re_inline.findall(content))
+        image_count = len(self._re_image.findall(content))
+        
+        # 结构化元素计数，复用已统计过的代码块/内联代码/图片
+        shared_counts = {
+            self._re_code_block.pattern: code_block_count,
+            self._re_inline.pattern: inline_code_count,
+            self._re_image.pattern: image_count,
+        }
+        structure_element_count = 0
+        for pattern, weight in self._re_structure:
+            count = shared_counts.get(pattern.pattern)
+            if count is None:
+                count = len(pattern.findall(content))
+            structure_element_count += count * weight
+        
+        # 去除代码块和特殊符号后的文本，用于可读性分析
+        clean_content = self._re_code_block.sub('', content)
+        clean_content = self._re_inline.sub('', clean_content)
+        clean_content = self._re_non_text.sub(' ', clean_content)
+        clean_sentence_count = sum(
+            1 for sentence in self._re_sentence.split(clean_content)
+            if sentence and not sentence.isspace()
+        )
+        
+        # 中文按字符计算，英文按单词计算；整段统计一次，无需逐句匹配
+        if clean_content.isascii():
+            chinese_char_count = 0
+        else:
+            chinese_char_count = len(clean_content) - len(self._re_chinese.sub('', clean_content))
+        english_word_count = len(self._re_en_word.findall(clean_content))
+        
+        # 小写文本只计算一次，供各评分函数共享
+        content_lower = content.lower()
+        
+        headers, list_items = self._key_point_candidates(content, max_key_points)
+        
+        return ContentFeatures(
+            title=title,
+            content=content,
+            content_lower=content_lower,
+            text_lower=f"{title.lower()} {content_lower}",
+            sentences=self._re_sentence.split(content),
+            clean_sentence_count=clean_sentence_count,
+            chinese_char_count=chinese_char_count,
+            english_word_count=english_word_count,
+            code_block_count=code_block_count,
+            inline_code_count=inline_code_count,
+            image_count=image_count,
+            url_count=len(self._re_url.findall(content)),
+            question_count=content.count('?') + content.count('？'),
+            structure_element_count=structure_element_count,
+            headers=headers,
+            list_items=list_items,
+            key_point_limit=max_key_points
+        )
+    
+    def _key_point_candidates(self, content: str, limit: int) -> Tuple[List[str], List[str]]:
+        """提取要点候选（标题、列表项）各前 limit 个，找够即停止扫描"""
+        headers = [m.group(1) for m in islice(self._re_header.finditer(content), limit)]
+        list_items = [m.group(1) for m in islice(self._re_list.finditer(content), limit)]
+        return headers, list_items
     
-    def calculate_readability_score(self, content: str) -> float:
+    def calculate_readability_score(self, features: ContentFeatures) -> float:
         """计算可读性评分"""
+        content = features.content
         if not content:
             return 0.0
         
-        # 去除代码块和特殊符号
-        clean_content = re.sub(r'```[\s\S]*?```', '', content)
-        clean_content = re.sub(r'`[^`]+`', '', clean_content)
-        clean_content = re.sub(r'[^\u4e00-\u9fff\w\s.,!?;:]', ' ', clean_content)
-        
-        # 分词（中英文混合）
-        sentences = re.split(r'[.!?。！？]', clean_content)
-        sentences = [s.strip() for s in sentences if s.strip()]
+        # 分句（中英文混合）
+        sentence_count = features.clean_sentence_count
         
-        if not sentences:
+        if not sentence_count:
             return 0.0
         
-        # 计算平均句长
-        total_words = 0
-        for sentence in sentences:
-            # 中文按字符计算，英文按单词计算
-            chinese_chars = len(re.findall(r'[\u4e00-\u9fff]', sentence))
-            english_words = len(re.findall(r'\b[a-zA-Z]+\b', sentence))
-            total_words += chinese_chars + english_words
-        
-        avg_sentence_length = total_words / len(sentences)
+        # 计算平均句长（中文按字符、英文按单词整体统计）
+        total_words = features.chinese_char_count + features.english_word_count
+        avg_sentence_length = total_words / sentence_count
         
         # 可读性评分（基于平均句长，适中的句长得分最高）
         if 10 <= avg_sentence_length <= 25:
@@ -147,111 +337,104 @@ class ContentEvaluator:
         
         return (readability * 0.7 + paragraph_score * 0.3)
     
-    def calculate_technical_depth(self, title: str, content: str) -> float:
+    def calculate_technical_depth(self, features: ContentFeatures) -> float:
         """计算技术深度评分"""
-        text = f"{title} {content}".lower()
+        text = features.text_lower
+        
+        # 按级别下标计数：[high, medium, low]
+        depth_scores = [0, 0, 0]
         
-        depth_scores = {"high": 0, "medium": 0, "low": 0}
+        for term, level in self._technical_terms:
+            if term in text:
+                depth_scores[level] += 1
         
-        for level, indicators in self.technical_indicators.items():
-            for indicator in indicators:
-                if indicator.lower() in text:
-                    depth_scores[level] += 1
+        high, medium, low = depth_scores
         
         # 代码块数量也是技术深度的指标
-        code_blocks = len(re.findall(r'```[\s\S]*?```', content))
-        inline_code = len(re.findall(r'`[^`]+`', content))
+        code_blocks = features.code_block_count
+        inline_code = features.inline_code_count
         
         if code_blocks > 5 or inline_code > 20:
-            depth_scores["high"] += 2
+            high += 2
         elif code_blocks > 2 or inline_code > 10:
-            depth_scores["medium"] += 1
+            medium += 1
         
         # 技术术语密度
         total_words = len(text.split())
         if total_words > 0:
-            tech_density = (depth_scores["high"] * 3 + depth_scores["medium"] * 2 + depth_scores["low"]) / total_words
+            tech_density = (high * 3 + medium * 2 + low) / total_words
             if tech_density > 0.1:
-                depth_scores["high"] += 1
+                high += 1
             elif tech_density > 0.05:
-                depth_scores["medium"] += 1
+                medium += 1
         
         # 计算最终评分
-        total_score = depth_scores["high"] * 3 + depth_scores["medium"] * 2 + depth_scores["low"]
+        total_score = high * 3 + medium * 2 + low
         max_possible = max(total_score, 10)  # 设置最大可能分数
         
         return min(total_score / max_possible, 1.0)
     
-    def calculate_originality_score(self, content: str) -> float:
+    def calculate_originality_score(self, features: ContentFeatures) -> float:
         """计算原创性评分"""
+        content = features.content
         if not content:
             return 0.0
         
         # 检查非原创指示词
-        non_original_count = 0
-        for indicator in self.non_original_indicators:
-            if indicator in content:
-                non_original_count += 1
+        non_original_count = sum(1 for term in self._non_original_terms if term in content)
         
         # 原创性基础分数
         originality = 1.0 - (non_original_count * 0.2)
         
-        # 检查内容重复度（简单的重复句子检测）
-        sentences = re.split(r'[.!?。！？]', content)
-        sentences = [s.strip() for s in sentences if len(s.strip()) > 10]
+        # 检查内容重复度（忽略大小写、空白和标点差异的重复句子检测）
+        sentences = [s.strip() for s in features.sentences if len(s.strip()) > 10]
         
         if len(sentences) > 1:
-            unique_sentences = set(sentences)
+            unique_sentences = {
+                self._re_non_word.sub('', sentence.lower()) or sentence
+                for sentence in sentences
+            }
             repetition_rate = 1 - (len(unique_sentences) / len(sentences))
             originality -= repetition_rate * 0.3
         
         # 检查是否包含大量链接（可能是聚合内容）
-        links = re.findall(r'https?://[^\s]+', content)
-        if len(links) > 10:
+        if features.url_count > 10:
             originality -= 0.2
         
         return max(originality, 0.0)
     
-    def calculate_structure_score(self, content: str) -> float:
+    def calculate_structure_score(self, features: ContentFeatures) -> float:
         """计算结构化评分"""
-        if not content:
+        if not features.content:
             return 0.0
         
-        structure_elements = 0
-        
-        for pattern in self.structure_indicators:
-            matches = re.findall(pattern, content)
-            if pattern.startswith(r'#+'):  # 标题权重更高
-                structure_elements += len(matches) * 2
-            else:
-                structure_elements += len(matches)
+        structure_elements = features.structure_element_count
         
         # 内容长度归一化
-        content_length = len(content)
+        content_length = len(features.content)
         if content_length > 0:
             structure_density = structure_elements / (content_length / 1000)  # 每1000字符的结构元素数
             return min(structure_density / 5, 1.0)  # 最高评分为1.0
         
         return 0.0
     
-    def calculate_engagement_score(self, title: str, content: str) -> float:
+    def calculate_engagement_score(self, features: ContentFeatures) -> float:
         """计算参与度评分"""
-        text = f"{title} {content}".lower()
+        text = features.text_lower
         
-        engagement_count = 0
-        for indicator in self.engagement_indicators:
-            if indicator in text:
-                engagement_count += 1
+        engagement_count = sum(1 for term in self._engagement_terms if term in text)
         
         # 问句数量（增加参与度）
-        questions = len(re.findall(r'[?？]', content))
+        questions = features.question_count
         engagement_count += min(questions / 3, 2)  # 最多加2分
         
         # 归一化评分
         return min(engagement_count / 5, 1.0)
     
-    def calculate_completeness_score(self, title: str, content: str) -> float:
+    def calculate_completeness_score(self, features: ContentFeatures) -> float:
         """计算完整性评分"""
+        title = features.title
+        content = features.content
         completeness = 0.0
         
         # 标题完整性
@@ -270,47 +453,48 @@ class ContentEvaluator:
             completeness += 0.1
         
         # 结论或总结
-        if any(keyword in content.lower() for keyword in ['conclusion', 'summary', '总结', '结论', '小结']):
+        if any(term in features.content_lower for term in self._conclusion_terms):
             completeness += 0.2
         
         # 示例代码或图片
-        has_code = bool(re.search(r'```[\s\S]*?```', content))
-        has_images = bool(re.search(r'!\[.*?\]\(.*?\)', content))
-        
-        if has_code:
+        if features.code_block_count > 0:
             completeness += 0.1
-        if has_images:
+        if features.image_count > 0:
             completeness += 0.1
         
         return min(completeness, 1.0)
     
-    def extract_key_points(self, content: str, max_points: int = 5) -> List[str]:
+    def extract_key_points(self, features: ContentFeatures, max_points: int = 5) -> List[str]:
         """提取文章要点"""
+        content = features.content
         if not content:
             return []
         
+        headers, list_items = features.headers, features.list_items
+        if max_points > features.key_point_limit:
+            # 预取的候选不足本次上限，按 max_points 重新扫描
+            headers, list_items = self._key_point_candidates(content, max_points)
+        
         key_points = []
         
         # 提取标题作为要点
-        headers = re.findall(r'#+\s+(.+)', content)
         key_points.extend(headers[:max_points])
         
         # 提取列表项
         if len(key_points) < max_points:
-            list_items = re.findall(r'(?:[-*]\s+|^\d+\.\s+)(.+)', content, re.MULTILINE)
             remaining = max_points - len(key_points)
             key_points.extend(list_items[:remaining])
         
         # 提取包含关键技术词汇的句子
         if len(key_points) < max_points:
-            sentences = re.split(r'[.!?。！？]', content)
             tech_sentences = []
             
-            for sentence in sentences:
+            for sentence in features.sentences:
                 sentence = sentence.strip()
                 if len(sentence) > 20 and len(sentence) < 200:
                     # 检查是否包含技术关键词
-                    if any(tech in sentence.lower() for tech in ['api', 'framework', 'library', 'algorithm', '算法', '框架', '接口']):
+                    sentence_lower = sentence.lower()
+                    if any(tech in sentence_lower for tech in self._key_point_terms):
                         tech_sentences.append(sentence)
             
             remaining = max_points - len(key_points)
@@ -349,35 +533,41 @@ class ContentEvaluator:
     
     def evaluate_article_quality(self, article: Dict[str, Any]) -> ContentAnalysis:
         """评估单篇文章质量"""
+        cache_key = _analysis_cache_key(article.get('title', ''), article.get('content', ''))
+        return self._evaluate_with_key(article, cache_key)
+    
+    def _evaluate_with_key(self, article: Dict[str, Any], cache_key: bytes) -> ContentAnalysis:
+        """评估单篇文章质量，cache_key 为调用方已算好的缓存键"""
         article_id = str(article.get('id', ''))
         title = article.get('title', '')
         content = article.get('content', '')
         
+        # 内容未变化的文章直接复用之前的评估结果
+        cached = _analysis_cache.get(cache_key)
+        if cached is not None:
+            _analysis_cache.move_to_end(cache_key)
+            return _copy_analysis(cached, article_id)
+        
+        # 一次性提取内容特征，供各评分函数共享
+        features = self._analyze_content(title, content)
+        
         # 计算各项评分
-        readability_score = self.calculate_readability_score(content)
-        technical_depth_score = self.calculate_technical_depth(title, content)
-        originality_score = self.calculate_originality_score(content)
-        structure_score = self.calculate_structure_score(content)
-        engagement_score = self.calculate_engagement_score(title, content)
-        completeness_score = self.calculate_completeness_score(title, content)
+        readability_score = self.calculate_readability_score(features)
+        technical_depth_score = self.calculate_technical_depth(features)
+        originality_score = self.calculate_originality_score(features)
+        structure_score = self.calculate_structure_score(features)
+        engagement_score = self.calculate_engagement_score(features)
+        completeness_score = self.calculate_completeness_score(features)
         
         # 计算综合评分（加权平均）
-        weights = {
-            'technical_depth': 0.25,
-            'originality': 0.20,
-            'completeness': 0.20,
-            'readability': 0.15,
-            'structure': 0.15,
-            'engagement': 0.05
-        }
-        
+        w_depth, w_originality, w_completeness, w_readability, w_structure, w_engagement = self._score_weights
         overall_score = (
-            technical_depth_score * weights['technical_depth'] +
-            originality_score * weights['originality'] +
-            completeness_score * weights['completeness'] +
-            readability_score * weights['readability'] +
-            structure_score * weights['structure'] +
-            engagement_score * weights['engagement']
+            technical_depth_score * w_depth +
+            originality_score * w_originality +
+            completeness_score * w_completeness +
+            readability_score * w_readability +
+            structure_score * w_structure +
+            engagement_score * w_engagement
         )
         
         # 创建质量指标对象
@@ -395,7 +585,7 @@ class ContentEvaluator:
         word_count = len(content)
         reading_time = max(1, word_count // 200)  # 假设200字/分钟的阅读速度
         
-        key_points = self.extract_key_points(content)
+        key_points = self.extract_key_points(features)
         improvement_suggestions = self.generate_improvement_suggestions(quality_metrics, word_count)
         
         # 确定质量等级
@@ -408,7 +598,7 @@ class ContentEvaluator:
         else:
             quality_grade = "D"
         
-        return ContentAnalysis(
+        analysis = ContentAnalysis(
             article_id=article_id,
             quality_metrics=quality_metrics,
             word_count=word_count,
@@ -417,75 +607,153 @@ class ContentEvaluator:
             improvement_suggestions=improvement_suggestions,
             quality_grade=quality_grade
         )
+        
+        _cache_analysis(cache_key, analysis)
+        
+        return analysis
+    
+    def _iter_articles(self, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """逐篇读取文章数据（分批游标，只取评估需要的字段）"""
+        if self.db.use_mongodb:
+            cursor = self.db.articles_collection.find(
+                {}, {"id": 1, "title": 1, "content": 1}
+            ).batch_size(_STREAM_BATCH_SIZE)
+            if limit:
+                cursor = cursor.limit(limit)
+            yield from cursor
+        else:
+            with self.db.get_session() as session:
+                from storage.models import ArticleDB
+                query = session.query(ArticleDB.id, ArticleDB.title, ArticleDB.content)
+                if limit:
+                    query = query.limit(limit)
+                for article_id, title, content in query.yield_per(_STREAM_BATCH_SIZE):
+                    yield {'id': article_id, 'title': title, 'content': content}
+    
+    def _evaluate_batch(self, articles: List[Dict[str, Any]], executor: Optional[ProcessPoolExecutor]) -> List[Tuple[Optional[ContentAnalysis], Optional[str]]]:
+        """评估一批文章，未命中缓存的文章较多时分发到进程池"""
+        results: List[Tuple[Optional[ContentAnalysis], Optional[str]]] = [(None, None)] * len(articles)
+        pending = []
+        
+        for index, article in enumerate(articles):
+            cache_key = _analysis_cache_key(article.get('title', ''), article.get('content', ''))
+            if cache_key in _analysis_cache:
+                results[index] = (self._evaluate_with_key(article, cache_key), None)
+            else:
+                pending.append((index, cache_key))
+        
+        if executor is None or len(pending) < _PARALLEL_MIN_ARTICLES:
+            for index, cache_key in pending:
+                try:
+                    results[index] = (self._evaluate_with_key(articles[index], cache_key), None)
+                except Exception as e:
+                    results[index] = (None, str(e))
+            return results
+        
+        # 只传递评估需要的字段，避免序列化整行数据
+        payloads = [
+            {
+                'id': articles[index].get('id', ''),
+                'title': articles[index].get('title', ''),
+                'content': articles[index].get('content', '')
+            }
+            for index, _ in pending
+        ]
+        
+        worker_results = executor.map(_evaluate_article_worker, payloads, chunksize=_PARALLEL_CHUNK_SIZE)
+        for (index, cache_key), (analysis, error) in zip(pending, worker_results):
+            results[index] = (analysis, error)
+            if analysis is not None:
+                _cache_analysis(cache_key, analysis)
+        
+        return results
+    
+    def _evaluate_articles(self, articles: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], Optional[ContentAnalysis], Optional[str]]]:
+        """按批流式评估文章，逐篇产出 (文章, 评估结果, 错误信息)"""
+        articles = iter(articles)
+        executor = None
+        
+        try:
+            while True:
+                batch = list(islice(articles, _STREAM_BATCH_SIZE))
+                if not batch:
+                    break
+                
+                # 第一批足够大时才启动进程池，之后的批次复用
+                if executor is None and len(batch) >= _PARALLEL_MIN_ARTICLES:
+                    executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+                
+                for article, (analysis, error) in zip(batch, self._evaluate_batch(batch, executor)):
+                    yield article, analysis, error
+        finally:
+            if executor is not None:
+                executor.shutdown()
     
     def batch_evaluate_quality(self, limit: int = None) -> Dict[str, Any]:
         """批量评估文章质量"""
         logger.info("开始批量质量评估")
         
         try:
-            # 获取文章数据
-            if self.db.use_mongodb:
-                query = {}
-                if limit:
-                    articles = list(self.db.articles_collection.find(query).limit(limit))
-                else:
-                    articles = list(self.db.articles_collection.find(query))
-            else:
-                with self.db.get_session() as session:
-                    from storage.models import ArticleDB
-                    query = session.query(ArticleDB)
-                    if limit:
-                        query = query.limit(limit)
-                    articles = query.all()
-                    articles = [article.to_dict() for article in articles]
-            
-            if not articles:
-                return {"error": "没有找到文章数据"}
-            
-            # 评估每篇文章
-            evaluations = []
+            # 流式读取并评估每篇文章
+            total_articles = 0
+            total_evaluated = 0
+            total_word_count = 0
+            total_reading_time = 0
+            previews = []  # 前 _PREVIEW_LIMIT 篇的 (评估结果, 指标向量)
             quality_stats = {"A": 0, "B": 0, "C": 0, "D": 0}
-            metric_totals = defaultdict(float)
+            metric_totals = [0.0] * len(_METRIC_NAMES)
             
-            for article in articles:
-                try:
-                    analysis = self.evaluate_article_quality(article)
-                    evaluations.append(analysis)
-                    
-                    # 统计质量等级分布
-                    quality_stats[analysis.quality_grade] += 1
-                    
-                    # 累计各项指标
-                    metric_totals["overall"] += analysis.quality_metrics.overall_score
-                    metric_totals["originality"] += analysis.quality_metrics.originality_score
-                    metric_totals["technical_depth"] += analysis.quality_metrics.technical_depth_score
-                    metric_totals["readability"] += analysis.quality_metrics.readability_score
-                    metric_totals["structure"] += analysis.quality_metrics.structure_score
-                    metric_totals["engagement"] += analysis.quality_metrics.engagement_score
-                    metric_totals["completeness"] += analysis.quality_metrics.completeness_score
-                    
-                except Exception as e:
-                    logger.warning(f"评估文章 {article.get('id', 'unknown')} 时出错: {str(e)}")
+            for article, analysis, error in self._evaluate_articles(self._iter_articles(limit)):
+                total_articles += 1
+                if analysis is None:
+                    logger.warning(f"评估文章 {article.get('id', 'unknown')} 时出错: {error}")
                     continue
+                
+                total_evaluated += 1
+                total_word_count += analysis.word_count
+                total_reading_time += analysis.reading_time
+                
+                # 统计质量等级分布
+                quality_stats[analysis.quality_grade] += 1
+                
+                # 累计各项指标（顺序与 _METRIC_NAMES 一致）
+                metrics = analysis.quality_metrics
+                scores = (
+                    metrics.overall_score,
+                    metrics.originality_score,
+                    metrics.technical_depth_score,
+                    metrics.readability_score,
+                    metrics.structure_score,
+                    metrics.engagement_score,
+                    metrics.completeness_score
+                )
+                for index, value in enumerate(scores):
+                    metric_totals[index] += value
+                
+                # 只保留预览所需的评估结果
+                if len(previews) < _PREVIEW_LIMIT:
+                    previews.append((analysis, scores))
+            
+            if total_articles == 0:
+                return {"error": "没有找到文章数据"}
             
             # 计算平均值
-            total_evaluated = len(evaluations)
             avg_metrics = {
                 metric: round(total / total_evaluated, 3)
-                for metric, total in metric_totals.items()
+                for metric, total in zip(_METRIC_NAMES, metric_totals)
             } if total_evaluated > 0 else {}
             
             # 生成总结报告
             summary = {
-                "total_articles": len(articles),
+                "total_articles": total_articles,
                 "successfully_evaluated": total_evaluated,
                 "quality_distribution": quality_stats,
                 "average_metrics": avg_metrics,
                 "quality_insights": {
                     "high_quality_rate": round((quality_stats["A"] + quality_stats["B"]) / total_evaluated * 100, 1) if total_evaluated > 0 else 0,
                     "needs_improvement_rate": round(quality_stats["D"] / total_evaluated * 100, 1) if total_evaluated > 0 else 0,
-                    "average_word_count": round(sum(eval.word_count for eval in evaluations) / total_evaluated, 0) if total_evaluated > 0 else 0,
-                    "average_reading_time": round(sum(eval.reading_time for eval in evaluations) / total_evaluated, 1) if total_evaluated > 0 else 0
+                    "average_word_count": round(total_word_count / total_evaluated, 0) if total_evaluated > 0 else 0,
+                    "average_reading_time": round(total_reading_time / total_evaluated, 1) if total_evaluated > 0 else 0
                 },
                 "evaluation_time": datetime.now().isoformat()
             }
@@ -496,21 +764,17 @@ class ContentEvaluator:
                     {
                         "article_id": eval.article_id,
                         "quality_grade": eval.quality_grade,
-                        "overall_score": round(eval.quality_metrics.overall_score, 3),
+                        "overall_score": round(scores[0], 3),
                         "word_count": eval.word_count,
                         "reading_time": eval.reading_time,
                         "key_points": eval.key_points[:3],  # 只返回前3个要点
                         "improvement_count": len(eval.improvement_suggestions),
                         "metrics": {
-                            "originality": round(eval.quality_metrics.originality_score, 3),
-                            "technical_depth": round(eval.quality_metrics.technical_depth_score, 3),
-                            "readability": round(eval.quality_metrics.readability_score, 3),
-                            "structure": round(eval.quality_metrics.structure_score, 3),
-                            "engagement": round(eval.quality_metrics.engagement_score, 3),
-                            "completeness": round(eval.quality_metrics.completeness_score, 3)
+                            metric: round(value, 3)
+                            for metric, value in zip(_METRIC_NAMES[1:], scores[1:])
                         }
                     }
-                    for eval in evaluations[:50]  # 返回前50个结果
+                    for eval, scores in previews  # 返回前50个结果
                 ]
             }
             
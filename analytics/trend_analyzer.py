@@ -3,12 +3,18 @@
 分析热门技术栈和关键词趋势、作者活跃度、文章发布频率等
 """
 
+import copy
+import os
 import re
 import sqlite3
-from collections import Counter, defaultdict
+import sys
+import time
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional, Any
-from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional, Any
+from functools import lru_cache
 import json
 import math
 
@@ -16,35 +22,168 @@ from storage.database import DatabaseManager
 from utils.logger import logger
 
 
-@dataclass
-class TrendData:
-    """趋势数据结构"""
-    keyword: str
-    count: int
-    percentage: float
-    growth_rate: Optional[float] = None
-    first_seen: Optional[str] = None
-    last_seen: Optional[str] = None
+# 分词：与正则 \b 的词边界定义一致
+_WORD_RE = re.compile(r'\w+')
 
+# 流式读取文章时每批的行数
+_STREAM_BATCH_SIZE = 1000
 
-@dataclass
-class AuthorStats:
-    """作者统计数据"""
-    author: str
-    article_count: int
-    total_words: int
-    avg_article_length: float
-    most_active_period: str
-    influence_score: float
-    top_keywords: List[str]
+# 一批文章达到该数量才使用进程池提取关键词，少量文章时进程启动和传输开销更大
+_PARALLEL_MIN_ARTICLES = 200
+_PARALLEL_CHUNK_SIZE = 32
 
+# API 调用模式（如 React.useState）。标识符长度设上限：超长的字母数字串不会是 API 名，
+# 也避免在这类串上反复回溯
+_API_CALL_RE = re.compile(r'\b[A-Z][a-zA-Z0-9]{0,63}\.[a-z][a-zA-Z0-9]{0,63}\b')
 
-@dataclass
-class TimeSeriesPoint:
-    """时间序列数据点"""
-    date: str
-    count: int
-    cumulative: int
+
+# ISO 日期前缀，不以 YYYY-MM-DD 开头的字符串直接视为无效日期
+_ISO_DATE_PREFIX_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso_datetime(value: str) -> datetime:
+    """解析 ISO 格式时间字符串，同一时间戳只解析一次"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _to_datetime(value: Any) -> Optional[datetime]:
+    """把文章时间（ISO 字符串或 datetime）转换为 datetime，无法识别时返回 None"""
+    if isinstance(value, datetime):
+        return value
+    if not isinstance(value, str) or not _ISO_DATE_PREFIX_RE.match(value):
+        return None
+    try:
+        return _parse_iso_datetime(value)
+    except ValueError:  # 前缀合法但日期本身非法，如 2024-13-45
+        return None
+
+
+# 综合趋势报告缓存：键为 (是否 MongoDB, 天数, 数据版本)。
+# 统计窗口随当前时间滑动，数据不变时报告也只在 TTL 内复用
+_REPORT_CACHE_SIZE = 8
+_REPORT_CACHE_TTL = 300  # 秒
+_report_cache: "OrderedDict[tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+
+def _cache_report(cache_key: tuple, report: Dict[str, Any]):
+    """写入综合报告缓存，超出容量时淘汰最久未使用的条目"""
+    _report_cache[cache_key] = (time.monotonic(), report)
+    _report_cache.move_to_end(cache_key)
+    if len(_report_cache) > _REPORT_CACHE_SIZE:
+        _report_cache.popitem(last=False)
+
+
+@lru_cache(maxsize=4096)
+def _day_key(year: int, month: int, day: int) -> str:
+    """生成 YYYY-MM-DD 日期键，同一天总是返回同一个字符串对象，避免逐行 strftime"""
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+def _roll_up_publication_counts(day_hour_counts: Counter) -> Tuple[Counter, Counter, Counter, Counter]:
+    """由 (YYYY-MM-DD, 小时) 计数汇总出日、周、月、小时统计
+    
+    逐篇文章只累加一个计数，周、月按不同日期汇总，每个日期只格式化一次
+    （SQLite 旧版本不支持 %U，SQL 分组结果也用同一方式汇总）
+    """
+    daily_counts = Counter()
+    hourly_counts = Counter()
+    for (day, hour), count in day_hour_counts.items():
+        daily_counts[day] += count
+        hourly_counts[hour] += count
+    
+    weekly_counts = Counter()
+    monthly_counts = Counter()
+    for day, count in daily_counts.items():
+        weekly_counts[datetime.strptime(day, '%Y-%m-%d').strftime('%Y-W%U')] += count
+        monthly_counts[day[:7]] += count
+    
+    return daily_counts, weekly_counts, monthly_counts, hourly_counts
+
+
+@lru_cache(maxsize=None)
+def _build_keyword_tables(tech_keywords: frozenset) -> Tuple[Dict[str, str], frozenset, tuple, Dict[str, set]]:
+    """构建关键词匹配表，同一关键词集合只构建一次，供所有分析器实例共享
+    
+    纯单词关键词（如 python、智能合约）命中当且仅当它是文本中一个完整的 \w+ 词，
+    直接与分词结果求交集；含空格或符号的短语关键词（如 next.js、c++、smart contract）
+    只在其各组成词都出现时才进入候选，再用候选短语的合并正则扫描
+    """
+    keyword_names = {keyword.lower(): keyword for keyword in tech_keywords}
+    word_keywords = frozenset(keyword for keyword in keyword_names if _WORD_RE.fullmatch(keyword))
+    phrase_keywords = sorted(set(keyword_names) - word_keywords, key=len, reverse=True)
+    phrase_keyword_parts = tuple(
+        (keyword, tuple(_WORD_RE.findall(keyword))) for keyword in phrase_keywords
+    )
+    # 同一位置只会返回最长的短语，需同时记入以词边界结尾的较短前缀短语
+    phrase_keyword_prefixes = {
+        keyword: {
+            prefix for prefix in phrase_keywords
+            if prefix == keyword
+            or (keyword.startswith(prefix) and re.match(r'\b' + re.escape(prefix) + r'\b', keyword))
+        }
+        for keyword in phrase_keywords
+    }
+    return keyword_names, word_keywords, phrase_keyword_parts, phrase_keyword_prefixes
+
+
+@lru_cache(maxsize=256)
+def _phrase_keyword_regex(phrase_keywords: Tuple[str, ...]) -> "re.Pattern":
+    """候选短语（按长度降序）的合并词边界正则；常见的候选组合只编译一次
+    
+    只扫描组成词都已出现的少数短语，比扫描全部短语的大分支正则快得多
+    """
+    return re.compile(
+        r'\b(?=(' + '|'.join(re.escape(keyword) for keyword in phrase_keywords) + r')\b)'
+    )
+
+
+def _extract_keywords(text: str, keyword_tables: tuple, title: Optional[str] = None) -> List[str]:
+    """用 _build_keyword_tables 构建的匹配表从文本中提取技术关键词
+    
+    API 调用模式只在标题中匹配（未提供标题时匹配整个文本）
+    """
+    if not text:
+        return []
+    
+    keyword_names, word_keywords, phrase_keyword_parts, phrase_keyword_prefixes = keyword_tables
+    
+    text_lower = text.lower()
+    words = set(_WORD_RE.findall(text_lower))
+    matched = words.intersection(word_keywords)
+    
+    candidates = tuple(
+        keyword for keyword, parts in phrase_keyword_parts
+        if all(part in words for part in parts)
+    )
+    if candidates:
+        for keyword in set(_phrase_keyword_regex(candidates).findall(text_lower)):
+            matched.update(phrase_keyword_prefixes[keyword])
+    
+    # 关键词名取自共享的关键词表，各 Counter 的键引用同一个字符串对象
+    found_keywords = [keyword_names[keyword] for keyword in matched]
+    
+    # 正文中的代码片段和链接会产生大量噪声匹配，文章只在标题中识别 API 调用
+    # （驻留字符串，避免按日期、按作者的 Counter 各自保存一份）
+    api_text = text if title is None else title
+    found_keywords.extend(map(sys.intern, _API_CALL_RE.findall(api_text)))
+    
+    return list(set(found_keywords))
+
+
+# 进程池工作进程中的关键词匹配表，由 _init_keyword_worker 设置
+_worker_keyword_tables = None
+
+
+def _init_keyword_worker(keyword_tables: tuple) -> None:
+    """进程池初始化：每个工作进程只接收一次关键词匹配表"""
+    global _worker_keyword_tables
+    _worker_keyword_tables = keyword_tables
+
+
+def _extract_keywords_worker(text: str, title: Optional[str]) -> List[str]:
+    """进程池任务：提取单篇文章的技术关键词"""
+    return _extract_keywords(text, _worker_keyword_tables, title)
 
 
 class TrendAnalyzer:
@@ -89,379 +228,458 @@ class TrendAnalyzer:
             'cicd', 'devops', 'terraform', 'ansible', 'jenkins', 'github actions',
             'monitoring', 'logging', 'prometheus', 'grafana', 'elk stack'
         }
-    
-    def extract_keywords_from_text(self, text: str) -> List[str]:
-        """从文本中提取技术关键词"""
-        if not text:
-            return []
-        
-        text_lower = text.lower()
-        found_keywords = []
-        
-        for keyword in self.tech_keywords:
-            # 使用词边界匹配，避免部分匹配
-            if re.search(r'\b' + re.escape(keyword.lower()) + r'\b', text_lower):
-                found_keywords.append(keyword)
-        
-        # 提取代码相关的模式
-        code_patterns = [
-            r'\b[A-Z][a-zA-Z0-9]*\.[a-z][a-zA-Z0-9]*\b',  # API调用模式
-            r'\b[a-z]+\-[a-z]+\b',  # kebab-case
-            r'\b[a-z]+_[a-z]+\b',   # snake_case
-        ]
-        
-        for pattern in code_patterns:
-            matches = re.findall(pattern, text)
-            found_keywords.extend(matches)
         
-        return list(set(found_keywords))
+        self._keyword_tables = _build_keyword_tables(frozenset(self.tech_keywords))
     
-    def analyze_technology_trends(self, days: int = 30) -> Dict[str, Any]:
-        """分析技术趋势"""
-        logger.info(f"分析最近 {days} 天的技术趋势")
+    def extract_keywords_from_text(self, text: str, title: Optional[str] = None) -> List[str]:
+        """从文本中提取技术关键词，提供 title 时 API 调用模式只在标题中匹配"""
+        return _extract_keywords(text, self._keyword_tables, title)
+    
+    def _iter_with_keywords(self, articles: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], List[str]]]:
+        """按批提取文章关键词，逐篇产出 (文章, 关键词列表)，文章足够多时使用进程池"""
+        articles = iter(articles)
+        executor = None
         
         try:
-            # 获取指定时间范围内的文章
-            cutoff_date = datetime.now() - timedelta(days=days)
-            
-            if self.db.use_mongodb:
-                articles = list(self.db.articles_collection.find({
-                    "crawl_time": {"$gte": cutoff_date.isoformat()}
-                }))
-            else:
-                with self.db.get_session() as session:
-                    from storage.models import ArticleDB
-                    articles = session.query(ArticleDB).filter(
-                        ArticleDB.crawl_time >= cutoff_date
-                    ).all()
-                    articles = [article.to_dict() for article in articles]
-            
-            if not articles:
-                return {"error": "没有找到指定时间范围内的文章"}
-            
-            # 提取所有关键词
-            all_keywords = []
-            keyword_by_date = defaultdict(Counter)
-            
-            for article in articles:
-                title = article.get('title', '')
-                content = article.get('content', '')
-                text = f"{title} {content}"
+            while True:
+                batch = list(islice(articles, _STREAM_BATCH_SIZE))
+                if not batch:
+                    break
+                
+                texts = [f"{article.get('title', '')} {article.get('content', '')}" for article in batch]
+                titles = [article.get('title') or '' for article in batch]
+                
+                # 第一批足够大时才启动进程池，之后的批次复用
+                if executor is None and len(batch) >= _PARALLEL_MIN_ARTICLES:
+                    executor = ProcessPoolExecutor(
+                        max_workers=os.cpu_count(),
+                        initializer=_init_keyword_worker,
+                        initargs=(self._keyword_tables,)
+                    )
                 
-                # 提取关键词
-                keywords = self.extract_keywords_from_text(text)
-                all_keywords.extend(keywords)
+                if executor is None or len(batch) < _PARALLEL_MIN_ARTICLES:
+                    keyword_lists = map(self.extract_keywords_from_text, texts, titles)
+                else:
+                    keyword_lists = executor.map(_extract_keywords_worker, texts, titles, chunksize=_PARALLEL_CHUNK_SIZE)
                 
-                # 按日期分组统计
-                article_date = article.get('publish_time', article.get('crawl_time', ''))
-                if article_date:
-                    try:
-                        if isinstance(article_date, str):
-                            date_obj = datetime.fromisoformat(article_date.replace('Z', '+00:00'))
-                        else:
-                            date_obj = article_date
-                        date_key = date_obj.strftime('%Y-%m-%d')
-                        for keyword in keywords:
-                            keyword_by_date[date_key][keyword] += 1
-                    except:
-                        continue
+                yield from zip(batch, keyword_lists)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+    
+    def _iter_articles(self, cutoff_date: datetime) -> Iterator[Dict[str, Any]]:
+        """逐篇读取指定时间之后抓取的文章（分批游标，只取分析需要的字段）"""
+        if self.db.use_mongodb:
+            projection = {"_id": 0, "author": 1, "title": 1, "content": 1, "publish_time": 1, "crawl_time": 1}
+            # crawl_time 以 BSON Date 存储，直接用 datetime 比较才能命中索引
+            yield from self.db.articles_collection.find(
+                {"crawl_time": {"$gte": cutoff_date}}, projection
+            ).batch_size(_STREAM_BATCH_SIZE)
+        else:
+            with self.db.get_session() as session:
+                from storage.models import ArticleDB
+                query = session.query(
+                    ArticleDB.author, ArticleDB.title, ArticleDB.content,
+                    ArticleDB.publish_time, ArticleDB.crawl_time
+                ).filter(ArticleDB.crawl_time >= cutoff_date)
+                for author, title, content, publish_time, crawl_time in query.yield_per(_STREAM_BATCH_SIZE):
+                    # 日期列直接保留 datetime 对象，无需再格式化后解析
+                    yield {
+                        'author': author,
+                        'title': title,
+                        'content': content,
+                        'publish_time': publish_time,
+                        'crawl_time': crawl_time
+                    }
+    
+    def _collect_all(self, days: int) -> Dict[str, Any]:
+        """一次遍历文章，同时收集技术趋势、作者活跃度和发布模式所需的统计
+        
+        每篇文章只读取、解析日期和提取关键词一次
+        """
+        cutoff_date = datetime.now() - timedelta(days=days)
+        
+        total_articles = 0
+        keyword_counts = Counter()
+        keyword_by_date = defaultdict(Counter)
+        author_stats = defaultdict(lambda: {
+            'article_count': 0,
+            'total_words': 0,
+            'keywords': Counter(),
+            'dates': [],
+            'titles': []
+        })
+        day_hour_counts = Counter()
+        skipped_dates = 0
+        
+        for article, keywords in self._iter_with_keywords(self._iter_articles(cutoff_date)):
+            total_articles += 1
             
-            # 统计总体趋势
-            keyword_counts = Counter(all_keywords)
-            total_articles = len(articles)
+            # 没有发布时间字段时使用抓取时间
+            article_date = article.get('publish_time', article.get('crawl_time', ''))
+            date_obj = _to_datetime(article_date) if article_date else None
+            if article_date and date_obj is None:
+                skipped_dates += 1
             
-            # 生成趋势数据
-            trends = []
-            for keyword, count in keyword_counts.most_common(50):
-                percentage = (count / total_articles) * 100
-                trend_data = TrendData(
-                    keyword=keyword,
-                    count=count,
-                    percentage=percentage
-                )
-                trends.append(trend_data)
+            # 发布时间分布
+            if date_obj is not None:
+                date_key = _day_key(date_obj.year, date_obj.month, date_obj.day)
+                day_hour_counts[date_key, date_obj.hour] += 1
             
-            # 计算增长率（与前一周期比较）
-            if days >= 14:  # 只有当分析周期足够长时才计算增长率
-                prev_cutoff = cutoff_date - timedelta(days=days)
-                # 这里可以添加增长率计算逻辑
+            title = article.get('title', '')
+            content = article.get('content', '')
             
-            return {
-                "period_days": days,
-                "total_articles": total_articles,
-                "total_keywords": len(keyword_counts),
-                "unique_keywords": len(set(all_keywords)),
-                "top_trends": [
-                    {
-                        "keyword": trend.keyword,
-                        "count": trend.count,
-                        "percentage": round(trend.percentage, 2),
-                        "articles_ratio": f"{trend.count}/{total_articles}"
-                    }
-                    for trend in trends[:20]
-                ],
-                "daily_distribution": dict(keyword_by_date),
-                "analysis_time": datetime.now().isoformat()
-            }
+            # 关键词按日期分组统计。每篇文章只查一次日期键，再由 Counter.update 在 C 层累加；
+            # 改成以 (日期, 关键词) 为键的扁平 Counter 要为每个关键词新建元组，输出前还要再转回嵌套结构，实测慢约 3 倍
+            keyword_counts.update(keywords)
+            if keywords and date_obj is not None:
+                keyword_by_date[date_key].update(keywords)
             
+            # 按作者统计
+            author = article.get('author', 'Unknown')
+            if not author or author in ['Unknown', '']:
+                continue
+            
+            stats = author_stats[author]
+            stats['article_count'] += 1
+            stats['total_words'] += len(content)
+            stats['titles'].append(title)
+            stats['keywords'].update(keywords)
+            if date_obj is not None:
+                stats['dates'].append(date_key)
+        
+        if skipped_dates:
+            logger.warning(f"{skipped_dates} 篇文章的日期无法解析，已跳过")
+        
+        daily_counts, weekly_counts, monthly_counts, hourly_counts = _roll_up_publication_counts(day_hour_counts)
+        return {
+            "cutoff_date": cutoff_date,
+            "total_articles": total_articles,
+            "keyword_counts": keyword_counts,
+            "keyword_by_date": keyword_by_date,
+            "author_stats": author_stats,
+            "daily_counts": daily_counts,
+            "weekly_counts": weekly_counts,
+            "monthly_counts": monthly_counts,
+            "hourly_counts": hourly_counts
+        }
+    
+    def analyze_technology_trends(self, days: int = 30) -> Dict[str, Any]:
+        """分析技术趋势"""
+        logger.info(f"分析最近 {days} 天的技术趋势")
+        
+        try:
+            return self._technology_trends_report(days, self._collect_all(days))
         except Exception as e:
             logger.error(f"技术趋势分析失败: {str(e)}")
             return {"error": str(e)}
     
+    def _technology_trends_report(self, days: int, collected: Dict[str, Any]) -> Dict[str, Any]:
+        """根据 _collect_all 的统计结果生成技术趋势报告"""
+        total_articles = collected["total_articles"]
+        if not total_articles:
+            return {"error": "没有找到指定时间范围内的文章"}
+        
+        keyword_counts = collected["keyword_counts"]
+        
+        # 计算增长率（与前一周期比较）
+        if days >= 14:  # 只有当分析周期足够长时才计算增长率
+            prev_cutoff = collected["cutoff_date"] - timedelta(days=days)
+            # 这里可以添加增长率计算逻辑
+        
+        return {
+            "period_days": days,
+            "total_articles": total_articles,
+            "total_keywords": len(keyword_counts),
+            "unique_keywords": len(keyword_counts),
+            "top_trends": [
+                {
+                    "keyword": keyword,
+                    "count": count,
+                    "percentage": round(count / total_articles * 100, 2),
+                    "articles_ratio": f"{count}/{total_articles}"
+                }
+                for keyword, count in keyword_counts.most_common(20)
+            ],
+            "daily_distribution": dict(collected["keyword_by_date"]),
+            "analysis_time": datetime.now().isoformat()
+        }
+    
     def analyze_author_activity(self, days: int = 30) -> Dict[str, Any]:
         """分析作者活跃度和影响力"""
         logger.info(f"分析最近 {days} 天的作者活跃度")
         
         try:
-            cutoff_date = datetime.now() - timedelta(days=days)
-            
-            if self.db.use_mongodb:
-                articles = list(self.db.articles_collection.find({
-                    "crawl_time": {"$gte": cutoff_date.isoformat()}
-                }))
+            return self._author_activity_report(days, self._collect_all(days))
+        except Exception as e:
+            logger.error(f"作者活跃度分析失败: {str(e)}")
+            return {"error": str(e)}
+    
+    def _author_activity_report(self, days: int, collected: Dict[str, Any]) -> Dict[str, Any]:
+        """根据 _collect_all 的统计结果生成作者活跃度报告"""
+        if not collected["total_articles"]:
+            return {"error": "没有找到指定时间范围内的文章"}
+        
+        # 计算影响力评分：(作者, 统计, 平均文章长度, 影响力评分)
+        author_analysis = []
+        
+        for author, stats in collected["author_stats"].items():
+            if stats['article_count'] == 0:
+                continue
+            
+            # 计算平均文章长度
+            avg_length = stats['total_words'] / stats['article_count']
+            
+            # 计算影响力评分（基于文章数量、平均长度、关键词多样性）
+            keyword_diversity = len(stats['keywords'])
+            influence_score = (
+                stats['article_count'] * 0.4 +
+                min(avg_length / 100, 10) * 0.3 +  # 标准化文章长度
+                keyword_diversity * 0.3
+            )
+            
+            author_analysis.append((author, stats, avg_length, influence_score))
+        
+        # 按影响力评分排序
+        author_analysis.sort(key=lambda item: item[3], reverse=True)
+        
+        # 最活跃时期和热门关键词只为展示的作者计算
+        top_authors = []
+        for author, stats, avg_length, influence_score in author_analysis[:15]:
+            if stats['dates']:
+                dates_counter = Counter([d[:7] for d in stats['dates']])  # YYYY-MM
+                most_active_period = dates_counter.most_common(1)[0][0]
             else:
-                with self.db.get_session() as session:
-                    from storage.models import ArticleDB
-                    articles = session.query(ArticleDB).filter(
-                        ArticleDB.crawl_time >= cutoff_date
-                    ).all()
-                    articles = [article.to_dict() for article in articles]
-            
-            if not articles:
-                return {"error": "没有找到指定时间范围内的文章"}
-            
-            # 按作者统计
-            author_stats = defaultdict(lambda: {
-                'article_count': 0,
-                'total_words': 0,
-                'keywords': Counter(),
-                'dates': [],
-                'titles': []
+                most_active_period = "未知"
+            
+            top_authors.append({
+                "author": author,
+                "article_count": stats['article_count'],
+                "avg_article_length": round(avg_length, 1),
+                "influence_score": round(influence_score, 2),
+                "most_active_period": most_active_period,
+                "top_keywords": [kw for kw, _ in stats['keywords'].most_common(3)],
+                "productivity": round(stats['article_count'] / days, 2)  # 每天文章数
             })
-            
-            for article in articles:
-                author = article.get('author', 'Unknown')
-                if not author or author in ['Unknown', '']:
-                    continue
-                
-                content = article.get('content', '')
-                title = article.get('title', '')
-                
-                # 统计文章数和字数
-                author_stats[author]['article_count'] += 1
-                author_stats[author]['total_words'] += len(content)
-                author_stats[author]['titles'].append(title)
-                
-                # 提取关键词
-                keywords = self.extract_keywords_from_text(f"{title} {content}")
-                for keyword in keywords:
-                    author_stats[author]['keywords'][keyword] += 1
-                
-                # 记录发布日期
-                article_date = article.get('publish_time', article.get('crawl_time', ''))
-                if article_date:
-                    try:
-                        if isinstance(article_date, str):
-                            date_obj = datetime.fromisoformat(article_date.replace('Z', '+00:00'))
-                        else:
-                            date_obj = article_date
-                        author_stats[author]['dates'].append(date_obj)
-                    except:
-                        continue
-            
-            # 计算影响力评分和统计信息
-            author_analysis = []
-            
-            for author, stats in author_stats.items():
-                if stats['article_count'] == 0:
-                    continue
-                
-                # 计算平均文章长度
-                avg_length = stats['total_words'] / stats['article_count']
-                
-                # 计算影响力评分（基于文章数量、平均长度、关键词多样性）
-                keyword_diversity = len(stats['keywords'])
-                influence_score = (
-                    stats['article_count'] * 0.4 +
-                    min(avg_length / 100, 10) * 0.3 +  # 标准化文章长度
-                    keyword_diversity * 0.3
-                )
-                
-                # 确定最活跃时期
-                if stats['dates']:
-                    dates_counter = Counter([d.strftime('%Y-%m') for d in stats['dates']])
-                    most_active_period = dates_counter.most_common(1)[0][0]
-                else:
-                    most_active_period = "未知"
-                
-                # 获取热门关键词
-                top_keywords = [kw for kw, _ in stats['keywords'].most_common(5)]
-                
-                author_data = AuthorStats(
-                    author=author,
-                    article_count=stats['article_count'],
-                    total_words=stats['total_words'],
-                    avg_article_length=avg_length,
-                    most_active_period=most_active_period,
-                    influence_score=influence_score,
-                    top_keywords=top_keywords
-                )
-                
-                author_analysis.append(author_data)
-            
-            # 按影响力评分排序
-            author_analysis.sort(key=lambda x: x.influence_score, reverse=True)
-            
-            return {
-                "period_days": days,
-                "total_authors": len(author_analysis),
-                "total_articles": len(articles),
-                "top_authors": [
-                    {
-                        "author": author.author,
-                        "article_count": author.article_count,
-                        "avg_article_length": round(author.avg_article_length, 1),
-                        "influence_score": round(author.influence_score, 2),
-                        "most_active_period": author.most_active_period,
-                        "top_keywords": author.top_keywords[:3],
-                        "productivity": round(author.article_count / days, 2)  # 每天文章数
-                    }
-                    for author in author_analysis[:15]
-                ],
-                "author_distribution": {
-                    "highly_active": len([a for a in author_analysis if a.article_count >= 5]),
-                    "moderately_active": len([a for a in author_analysis if 2 <= a.article_count < 5]),
-                    "occasionally_active": len([a for a in author_analysis if a.article_count == 1])
+        
+        article_counts = [stats['article_count'] for _, stats, _, _ in author_analysis]
+        
+        return {
+            "period_days": days,
+            "total_authors": len(author_analysis),
+            "total_articles": collected["total_articles"],
+            "top_authors": top_authors,
+            "author_distribution": {
+                "highly_active": sum(1 for count in article_counts if count >= 5),
+                "moderately_active": sum(1 for count in article_counts if 2 <= count < 5),
+                "occasionally_active": sum(1 for count in article_counts if count == 1)
+            },
+            "analysis_time": datetime.now().isoformat()
+        }
+    
+    def _count_publications_sql(self, days: int) -> Dict[str, Any]:
+        """在 SQLite 中按发布日期和小时分组计数，不把文章行读入 Python
+        
+        返回与 _collect_all 相同键名的发布时间统计
+        """
+        from sqlalchemy import func
+        from storage.models import ArticleDB
+        
+        cutoff_date = datetime.now() - timedelta(days=days)
+        day_expr = func.strftime('%Y-%m-%d', ArticleDB.publish_time)
+        hour_expr = func.strftime('%H', ArticleDB.publish_time)
+        with self.db.get_session() as session:
+            rows = session.query(day_expr, hour_expr, func.count()).filter(
+                ArticleDB.crawl_time >= cutoff_date
+            ).group_by(day_expr, hour_expr).all()
+        
+        total_articles = 0
+        day_hour_counts = Counter()
+        for day, hour, count in rows:
+            total_articles += count
+            if day is None:  # 没有发布时间的文章只计入总数
+                continue
+            day_hour_counts[day, int(hour)] += count
+        
+        daily_counts, weekly_counts, monthly_counts, hourly_counts = _roll_up_publication_counts(day_hour_counts)
+        return {
+            "cutoff_date": cutoff_date,
+            "total_articles": total_articles,
+            "daily_counts": daily_counts,
+            "weekly_counts": weekly_counts,
+            "monthly_counts": monthly_counts,
+            "hourly_counts": hourly_counts
+        }
+    
+    def _count_publications_mongo(self, days: int) -> Dict[str, Any]:
+        """在 MongoDB 中用聚合管道按发布日期和小时分组计数，不把文档传回 Python
+        
+        返回与 _collect_all 相同键名的发布时间统计
+        """
+        cutoff_date = datetime.now() - timedelta(days=days)
+        # 没有 publish_time 字段时使用 crawl_time；字段存在但为空或无法解析时只计入总数
+        article_date = {
+            "$convert": {
+                "input": {
+                    "$cond": [
+                        {"$eq": [{"$type": "$publish_time"}, "missing"]},
+                        "$crawl_time",
+                        "$publish_time"
+                    ]
                 },
-                "analysis_time": datetime.now().isoformat()
+                "to": "date",
+                "onError": None,
+                "onNull": None
             }
-            
-        except Exception as e:
-            logger.error(f"作者活跃度分析失败: {str(e)}")
-            return {"error": str(e)}
+        }
+        pipeline = [
+            {"$match": {"crawl_time": {"$gte": cutoff_date}}},
+            {"$project": {"_id": 0, "date": article_date}},
+            {"$group": {
+                "_id": {
+                    "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}},
+                    "hour": {"$hour": "$date"}
+                },
+                "count": {"$sum": 1}
+            }},
+            {"$sort": {"_id.day": 1, "_id.hour": 1}}
+        ]
+        
+        total_articles = 0
+        day_hour_counts = Counter()
+        for row in self.db.articles_collection.aggregate(pipeline):
+            total_articles += row["count"]
+            day = row["_id"].get("day")
+            if day is None:
+                continue
+            day_hour_counts[day, row["_id"]["hour"]] += row["count"]
+        
+        daily_counts, weekly_counts, monthly_counts, hourly_counts = _roll_up_publication_counts(day_hour_counts)
+        return {
+            "cutoff_date": cutoff_date,
+            "total_articles": total_articles,
+            "daily_counts": daily_counts,
+            "weekly_counts": weekly_counts,
+            "monthly_counts": monthly_counts,
+            "hourly_counts": hourly_counts
+        }
     
     def analyze_publication_patterns(self, days: int = 90) -> Dict[str, Any]:
         """分析文章发布频率和时间分布"""
         logger.info(f"分析最近 {days} 天的发布模式")
         
         try:
-            cutoff_date = datetime.now() - timedelta(days=days)
-            
+            # 只需计数，直接在数据库中分组，不读取文档
             if self.db.use_mongodb:
-                articles = list(self.db.articles_collection.find({
-                    "crawl_time": {"$gte": cutoff_date.isoformat()}
-                }))
+                collected = self._count_publications_mongo(days)
             else:
-                with self.db.get_session() as session:
-                    from storage.models import ArticleDB
-                    articles = session.query(ArticleDB).filter(
-                        ArticleDB.crawl_time >= cutoff_date
-                    ).all()
-                    articles = [article.to_dict() for article in articles]
-            
-            if not articles:
-                return {"error": "没有找到指定时间范围内的文章"}
-            
-            # 按日期分组统计
-            daily_counts = Counter()
-            weekly_counts = Counter()
-            monthly_counts = Counter()
-            hourly_counts = Counter()
-            
-            for article in articles:
-                article_date = article.get('publish_time', article.get('crawl_time', ''))
-                if not article_date:
-                    continue
-                
-                try:
-                    if isinstance(article_date, str):
-                        date_obj = datetime.fromisoformat(article_date.replace('Z', '+00:00'))
-                    else:
-                        date_obj = article_date
-                    
-                    daily_counts[date_obj.strftime('%Y-%m-%d')] += 1
-                    weekly_counts[date_obj.strftime('%Y-W%U')] += 1
-                    monthly_counts[date_obj.strftime('%Y-%m')] += 1
-                    hourly_counts[date_obj.hour] += 1
-                    
-                except:
-                    continue
-            
-            # 计算统计指标
-            daily_values = list(daily_counts.values())
-            avg_daily = sum(daily_values) / len(daily_values) if daily_values else 0
-            max_daily = max(daily_values) if daily_values else 0
-            min_daily = min(daily_values) if daily_values else 0
-            
-            # 找出最活跃的时间段
-            most_active_day = daily_counts.most_common(1)[0] if daily_counts else ("", 0)
-            most_active_hour = hourly_counts.most_common(1)[0] if hourly_counts else (0, 0)
-            most_active_month = monthly_counts.most_common(1)[0] if monthly_counts else ("", 0)
-            
-            # 生成时间序列数据
-            time_series = []
-            cumulative = 0
-            for date in sorted(daily_counts.keys()):
-                count = daily_counts[date]
-                cumulative += count
-                time_series.append(TimeSeriesPoint(
-                    date=date,
-                    count=count,
-                    cumulative=cumulative
-                ))
-            
-            return {
-                "period_days": days,
-                "total_articles": len(articles),
-                "daily_statistics": {
-                    "average": round(avg_daily, 1),
-                    "maximum": max_daily,
-                    "minimum": min_daily,
-                    "most_active_day": {
-                        "date": most_active_day[0],
-                        "count": most_active_day[1]
-                    }
-                },
-                "temporal_patterns": {
-                    "most_active_hour": {
-                        "hour": most_active_hour[0],
-                        "count": most_active_hour[1]
-                    },
-                    "most_active_month": {
-                        "month": most_active_month[0],
-                        "count": most_active_month[1]
-                    }
-                },
-                "time_series": [
-                    {
-                        "date": point.date,
-                        "count": point.count,
-                        "cumulative": point.cumulative
-                    }
-                    for point in time_series[-30:]  # 最近30天
-                ],
-                "distribution_summary": {
-                    "days_with_articles": len(daily_counts),
-                    "active_weeks": len(weekly_counts),
-                    "active_months": len(monthly_counts),
-                    "coverage_rate": round(len(daily_counts) / days * 100, 1)
-                },
-                "analysis_time": datetime.now().isoformat()
-            }
-            
+                collected = self._count_publications_sql(days)
+            return self._publication_patterns_report(days, collected)
         except Exception as e:
             logger.error(f"发布模式分析失败: {str(e)}")
             return {"error": str(e)}
     
+    def _publication_patterns_report(self, days: int, collected: Dict[str, Any]) -> Dict[str, Any]:
+        """根据发布时间统计结果生成发布模式报告"""
+        total_articles = collected["total_articles"]
+        if not total_articles:
+            return {"error": "没有找到指定时间范围内的文章"}
+        
+        daily_counts = collected["daily_counts"]
+        weekly_counts = collected["weekly_counts"]
+        monthly_counts = collected["monthly_counts"]
+        hourly_counts = collected["hourly_counts"]
+        
+        # 计算统计指标
+        daily_values = list(daily_counts.values())
+        avg_daily = sum(daily_values) / len(daily_values) if daily_values else 0
+        max_daily = max(daily_values) if daily_values else 0
+        min_daily = min(daily_values) if daily_values else 0
+        
+        # 找出最活跃的时间段
+        most_active_day = daily_counts.most_common(1)[0] if daily_counts else ("", 0)
+        most_active_hour = hourly_counts.most_common(1)[0] if hourly_counts else (0, 0)
+        most_active_month = monthly_counts.most_common(1)[0] if monthly_counts else ("", 0)
+        
+        # 生成时间序列数据
+        time_series = []
+        cumulative = 0
+        for date in sorted(daily_counts.keys()):
+            count = daily_counts[date]
+            cumulative += count
+            time_series.append({
+                "date": date,
+                "count": count,
+                "cumulative": cumulative
+            })
+        
+        return {
+            "period_days": days,
+            "total_articles": total_articles,
+            "daily_statistics": {
+                "average": round(avg_daily, 1),
+                "maximum": max_daily,
+                "minimum": min_daily,
+                "most_active_day": {
+                    "date": most_active_day[0],
+                    "count": most_active_day[1]
+                }
+            },
+            "temporal_patterns": {
+                "most_active_hour": {
+                    "hour": most_active_hour[0],
+                    "count": most_active_hour[1]
+                },
+                "most_active_month": {
+                    "month": most_active_month[0],
+                    "count": most_active_month[1]
+                }
+            },
+            "time_series": time_series[-30:],  # 最近30天
+            "distribution_summary": {
+                "days_with_articles": len(daily_counts),
+                "active_weeks": len(weekly_counts),
+                "active_months": len(monthly_counts),
+                "coverage_rate": round(len(daily_counts) / days * 100, 1)
+            },
+            "analysis_time": datetime.now().isoformat()
+        }
+        
+    def _data_version(self) -> Tuple[int, Any]:
+        """文章数据版本：(文章数, 最新抓取时间)，新文章写入或删除后随之变化"""
+        if self.db.use_mongodb:
+            latest = self.db.articles_collection.find_one(
+                {}, {"_id": 0, "crawl_time": 1}, sort=[("crawl_time", -1)]
+            )
+            return (
+                self.db.articles_collection.estimated_document_count(),
+                latest.get("crawl_time") if latest else None
+            )
+        
+        from sqlalchemy import func
+        from storage.models import ArticleDB
+        
+        with self.db.get_session() as session:
+            count, latest = session.query(func.count(ArticleDB.id), func.max(ArticleDB.crawl_time)).one()
+        return count, latest
+    
     def get_comprehensive_trends(self, days: int = 30) -> Dict[str, Any]:
         """获取综合趋势分析报告"""
         logger.info("生成综合趋势分析报告")
         
         try:
-            # 获取各项分析结果
-            tech_trends = self.analyze_technology_trends(days)
-            author_activity = self.analyze_author_activity(days)
-            publication_patterns = self.analyze_publication_patterns(days)
+            # 文章数据没有变化且缓存未过期时直接返回上次的报告
+            cache_key = (self.db.use_mongodb, days, self._data_version())
+            cached = _report_cache.get(cache_key)
+            if cached is not None and time.monotonic() - cached[0] < _REPORT_CACHE_TTL:
+                _report_cache.move_to_end(cache_key)
+                return copy.deepcopy(cached[1])
+            
+            # 一次遍历文章收集全部统计，再分别生成各项分析结果
+            collected = self._collect_all(days)
+            tech_trends = self._technology_trends_report(days, collected)
+            author_activity = self._author_activity_report(days, collected)
+            publication_patterns = self._publication_patterns_report(days, collected)
             
             # 生成综合报告
             report = {
@@ -482,6 +700,7 @@ class TrendAnalyzer:
                 }
             }
             
+            _cache_report(cache_key, copy.deepcopy(report))
             return report
             
         except Exception as e:
@@ -491,24 +710,51 @@ class TrendAnalyzer:
             self.db.close()
 
 
+# trigram 索引只能匹配至少 3 个字符的关键词
+_FTS_MIN_KEYWORD_LENGTH = 3
+
+
+def _has_articles_fts(conn: sqlite3.Connection) -> bool:
+    """文章全文索引 articles_fts 是否存在（由 DatabaseManager 在开启 SQLITE_FTS 时创建）"""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'"
+    ).fetchone() is not None
+
+
 def analyze_keyword_growth(db_path: str, keyword: str, days: int = 60) -> Dict[str, Any]:
     """分析特定关键词的增长趋势"""
     try:
         conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # 获取包含关键词的文章，按时间分组
-        query = """
-        SELECT DATE(publish_time) as date, COUNT(*) as count
-        FROM articles 
-        WHERE (title LIKE ? OR content LIKE ?)
-        AND datetime(publish_time) >= datetime('now', '-{} days')
-        GROUP BY DATE(publish_time)
-        ORDER BY date
-        """.format(days)
-        
-        cursor.execute(query, (f'%{keyword}%', f'%{keyword}%'))
-        results = cursor.fetchall()
+        try:
+            cursor = conn.cursor()
+            since = f"-{int(days)} days"
+            
+            # 获取包含关键词的文章，按时间分组
+            if len(keyword) >= _FTS_MIN_KEYWORD_LENGTH and _has_articles_fts(conn):
+                # 用全文索引查找命中的文章，避免对 title/content 做全表 LIKE 扫描
+                query = """
+                SELECT DATE(a.publish_time) as date, COUNT(*) as count
+                FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid
+                WHERE articles_fts MATCH ?
+                AND datetime(a.publish_time) >= datetime('now', ?)
+                GROUP BY DATE(a.publish_time)
+                ORDER BY date
+                """
+                phrase = '"' + keyword.replace('"', '""') + '"'
+                cursor.execute(query, (phrase, since))
+            else:
+                query = """
+                SELECT DATE(publish_time) as date, COUNT(*) as count
+                FROM articles 
+                WHERE (title LIKE ? OR content LIKE ?)
+                AND datetime(publish_time) >= datetime('now', ?)
+                GROUP BY DATE(publish_time)
+                ORDER BY date
+                """
+                cursor.execute(query, (f'%{keyword}%', f'%{keyword}%', since))
+            results = cursor.fetchall()
+        finally:
+            conn.close()
         
         if not results:
             return {"keyword": keyword, "data": [], "growth_rate": 0}
@@ -525,8 +771,6 @@ def analyze_keyword_growth(db_path: str, keyword: str, days: int = 60) -> Dict[s
         else:
             growth_rate = 0
         
-        conn.close()
-        
         return {
             "keyword": keyword,
             "total_mentions": sum([count for _, count in results]),
@@ -1,17 +1,104 @@
 import asyncio
 import re
+from functools import lru_cache
 from typing import List, Set, Optional
 from urllib.parse import urljoin, urlparse, parse_qs
-from playwright.async_api import Page
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeout
 from crawler.browser import CrawlerBase
+from storage.database import DatabaseManager
 from utils.logger import logger
 
 
+# Raw href attributes (not resolved element.href) of all matched elements,
+# read in a single evaluation instead of one get_attribute round-trip per element
+_HREFS_JS = "(elements) => elements.map(element => element.getAttribute('href'))"
+
+# Account name (trimmed text) and profile link (raw href) of an article page,
+# each taken from the first of its selectors (in order) that yields one
+_ACCOUNT_INFO_JS = """([nameSelectors, profileSelectors]) => {
+    const info = {name: null, profile: null};
+    for (const selector of nameSelectors) {
+        const element = document.querySelector(selector);
+        if (element) {
+            info.name = element.textContent.trim();
+            break;
+        }
+    }
+    for (const selector of profileSelectors) {
+        const href = document.querySelector(selector)?.getAttribute('href');
+        if (href) {
+            info.profile = href;
+            break;
+        }
+    }
+    return info;
+}"""
+
+# [page height, article link count], compared by _CONTENT_GREW_JS after scrolling
+_CONTENT_STATE_JS = """() => [
+    document.body.scrollHeight,
+    document.querySelectorAll('a[href*="mp.weixin.qq.com"]').length
+]"""
+
+# True once the page grew or gained article links compared to the given state
+_CONTENT_GREW_JS = """([height, links]) =>
+    document.body.scrollHeight > height ||
+    document.querySelectorAll('a[href*="mp.weixin.qq.com"]').length > links"""
+
+# Account pages rather than articles
+_SKIP_URL_RE = re.compile(r'action=profile|action=follow|__biz=')
+
+
+@lru_cache(maxsize=65536)
+def _is_valid_wechat_article_url(url: str) -> bool:
+    """Check if URL is a valid WeChat article (cached: pages repeat the same links)"""
+    try:
+        if not url or 'mp.weixin.qq.com' not in url:
+            return False
+        
+        # Parse URL to check for article pattern
+        parsed = urlparse(url)
+        if '/s/' not in parsed.path and '/s?' not in parsed.query:
+            return False
+        
+        # Skip certain types of URLs
+        return not _SKIP_URL_RE.search(url)
+        
+    except Exception:
+        return False
+
+
 class ArticleDiscovery(CrawlerBase):
     """Discover articles from a WeChat account starting from a single article"""
     
-    def __init__(self):
+    # Account name elements on an article page, in order of preference
+    ACCOUNT_SELECTORS = ('span#js_name', 'strong#profileBt a', 'a#js_name', '.profile_nickname')
+    ACCOUNT_SELECTOR = ', '.join(ACCOUNT_SELECTORS)
+    
+    # Links from an article page to the account profile, in order of preference
+    PROFILE_SELECTORS = ('a#js_name', 'strong#profileBt a', 'a[href*="profile"]')
+    
+    # Previous/next/more article links; :has-text() is Playwright's text
+    # matcher (CSS has no :contains()), and one selector list lets the
+    # whole scan run in a single round-trip
+    NAVIGATION_SELECTOR = ', '.join([
+        'a[href*="mp.weixin.qq.com"]:has-text("上一篇")',
+        'a[href*="mp.weixin.qq.com"]:has-text("下一篇")',
+        'a[href*="mp.weixin.qq.com"]:has-text("往期")',
+        'a[href*="mp.weixin.qq.com"]:has-text("更多")',
+        '.js_previous_article',
+        '.js_next_article'
+    ])
+    
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        """
+        Args:
+            db: Optional database; articles already stored there are not rediscovered
+        """
         super().__init__()
+        self.db = db
+        # Exact set rather than a Bloom filter: a false positive would silently
+        # drop an article, and one account's URLs fit easily in memory
         self.discovered_urls: Set[str] = set()
         self.account_name = None
         
@@ -33,172 +120,180 @@ class ArticleDiscovery(CrawlerBase):
             self.discovered_urls.add(start_url)
             discovered_articles.append(start_url)
             
-            logger.info(f"Starting discovery from: {start_url}")
+            # Treat articles saved by earlier runs as already discovered
+            if self.db:
+                known_urls = self.db.get_article_urls()
+                self.discovered_urls.update(known_urls)
+                logger.info("Skipping {} already stored articles", len(known_urls))
             
-            # Extract account information from the first article
-            await self._extract_account_info(start_url)
+            logger.info("Starting discovery from: {}", start_url)
             
-            # Discover more articles through various methods
-            await self._discover_through_profile(start_url, discovered_articles, max_articles)
-            await self._discover_through_related_links(start_url, discovered_articles, max_articles)
-            await self._discover_through_navigation(start_url, discovered_articles, max_articles)
+            # Load the start article once and run every extractor against it
+            # networkidle often never settles on WeChat pages (analytics, long polling),
+            # so wait for the DOM and then only for the account header we need
+            async with self.browser_manager.page() as page:
+                await self._open(page, start_url)
+                try:
+                    await page.wait_for_selector(self.ACCOUNT_SELECTOR, timeout=5000)
+                except PlaywrightTimeout:
+                    logger.debug("Account header not found on start article")
+                
+                # Extract account information and the profile link from the first article
+                profile_href = await self._extract_account_info(page)
+                profile_url = urljoin(start_url, profile_href) if profile_href else None
+                
+                # Discover more articles through various methods concurrently, so the
+                # profile page load overlaps with reading links from the start article.
+                # Each strategy handles its own errors; URL bookkeeping has no await between
+                # the membership check and the append, so no lock is needed
+                if not self._quota_reached(discovered_articles, max_articles):
+                    await self._run_until_quota([
+                        self._discover_through_profile(profile_url, discovered_articles, max_articles),
+                        self._discover_through_related_links(page, discovered_articles, max_articles),
+                        self._discover_through_navigation(page, discovered_articles, max_articles)
+                    ], discovered_articles, max_articles)
             
-            logger.info(f"Discovery complete. Found {len(discovered_articles)} articles")
+            logger.info("Discovery complete. Found {} articles", len(discovered_articles))
             return discovered_articles
             
         except Exception as e:
-            logger.error(f"Failed to discover articles: {str(e)}")
+            logger.error("Failed to discover articles: {}", e)
             return discovered_articles
     
-    async def _extract_account_info(self, article_url: str):
-        """Extract account information from the article"""
-        page = await self.browser_manager.new_page()
-        
+    @staticmethod
+    def _quota_reached(discovered_articles: List[str], max_articles: Optional[int]) -> bool:
+        """Check whether max_articles articles have been discovered"""
+        return bool(max_articles) and len(discovered_articles) >= max_articles
+    
+    async def _run_until_quota(self, strategies, discovered_articles: List[str], max_articles: Optional[int]):
+        """Run discovery strategies concurrently, cancelling the rest once the quota is met"""
+        pending = {asyncio.ensure_future(strategy) for strategy in strategies}
         try:
-            await page.goto(article_url, wait_until="networkidle", timeout=30000)
-            
-            # Extract account name and info
-            account_selectors = [
-                'span#js_name',
-                'strong#profileBt a',
-                'a#js_name',
-                '.profile_nickname'
-            ]
-            
-            for selector in account_selectors:
-                element = await page.query_selector(selector)
-                if element:
-                    self.account_name = await element.get_text_content()
-                    logger.info(f"Detected account: {self.account_name}")
+            while pending:
+                _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if pending and self._quota_reached(discovered_articles, max_articles):
+                    logger.info("Reached {} articles, stopping remaining discovery", max_articles)
                     break
-            
-        except Exception as e:
-            logger.warning(f"Failed to extract account info: {str(e)}")
         finally:
-            await page.close()
+            # Also reached when discovery itself is cancelled
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
     
-    async def _discover_through_profile(self, start_url: str, discovered_articles: List[str], max_articles: Optional[int]):
-        """Discover articles through the account profile page"""
-        page = await self.browser_manager.new_page()
+    async def _open(self, page: Page, url: str):
+        """Navigate to url without waiting for slow pages to finish loading
         
+        A navigation timeout is not an error here: the page is usually usable
+        by then, and callers wait for the elements they need themselves.
+        """
         try:
-            await page.goto(start_url, wait_until="networkidle", timeout=30000)
-            
-            # Look for profile link
-            profile_selectors = [
-                'a#js_name',
-                'strong#profileBt a',
-                'a[href*="profile"]'
-            ]
-            
-            profile_url = None
-            for selector in profile_selectors:
-                element = await page.query_selector(selector)
-                if element:
-                    href = await element.get_attribute('href')
-                    if href:
-                        profile_url = urljoin(start_url, href)
-                        break
+            await page.goto(url, wait_until="domcontentloaded")
+        except PlaywrightTimeout:
+            logger.debug("Navigation still loading, continuing: {}", url)
+    
+    async def _extract_account_info(self, page: Page) -> Optional[str]:
+        """
+        Extract account information from the loaded article page
+        
+        Returns:
+            The raw href of the account profile link, if any
+        """
+        try:
+            # Account name and profile link share one round-trip
+            info = await page.evaluate(
+                _ACCOUNT_INFO_JS, [list(self.ACCOUNT_SELECTORS), list(self.PROFILE_SELECTORS)]
+            )
+            if info['name']:
+                self.account_name = info['name']
+                logger.info("Detected account: {}", self.account_name)
+            return info['profile']
             
+        except Exception as e:
+            logger.warning("Failed to extract account info: {}", e)
+            return None
+    
+    async def _discover_through_profile(self, profile_url: Optional[str], discovered_articles: List[str], max_articles: Optional[int]):
+        """Discover articles through the account profile page linked from the article"""
+        try:
             if profile_url:
-                logger.info(f"Found profile URL: {profile_url}")
+                logger.info("Found profile URL: {}", profile_url)
                 await self._crawl_profile_page(profile_url, discovered_articles, max_articles)
             
         except Exception as e:
-            logger.warning(f"Failed to discover through profile: {str(e)}")
-        finally:
-            await page.close()
+            logger.warning("Failed to discover through profile: {}", e)
     
     async def _crawl_profile_page(self, profile_url: str, discovered_articles: List[str], max_articles: Optional[int]):
         """Crawl the account profile page for article links"""
-        page = await self.browser_manager.new_page()
-        
         try:
-            await page.goto(profile_url, wait_until="networkidle", timeout=30000)
-            
-            # Look for article links
-            await self._extract_article_links_from_page(page, discovered_articles, max_articles)
-            
-            # Try to load more articles by scrolling
-            await self._scroll_and_load_more(page, discovered_articles, max_articles)
+            async with self.browser_manager.page() as page:
+                await self._open(page, profile_url)
+                try:
+                    await page.wait_for_selector('a[href*="mp.weixin.qq.com"]', timeout=5000)
+                except PlaywrightTimeout:
+                    logger.debug("No article links rendered on profile page")
+                
+                # Look for article links
+                await self._extract_article_links_from_page(page, discovered_articles, max_articles)
+                
+                # Try to load more articles by scrolling
+                await self._scroll_and_load_more(page, discovered_articles, max_articles)
             
         except Exception as e:
-            logger.warning(f"Failed to crawl profile page: {str(e)}")
-        finally:
-            await page.close()
+            logger.warning("Failed to crawl profile page: {}", e)
     
-    async def _discover_through_related_links(self, start_url: str, discovered_articles: List[str], max_articles: Optional[int]):
+    async def _discover_through_related_links(self, page: Page, discovered_articles: List[str], max_articles: Optional[int]):
         """Discover articles through related links in the article content"""
-        page = await self.browser_manager.new_page()
-        
         try:
-            await page.goto(start_url, wait_until="networkidle", timeout=30000)
-            
             # Extract all WeChat article links from the content
             await self._extract_article_links_from_page(page, discovered_articles, max_articles)
             
         except Exception as e:
-            logger.warning(f"Failed to discover through related links: {str(e)}")
-        finally:
-            await page.close()
+            logger.warning("Failed to discover through related links: {}", e)
     
-    async def _discover_through_navigation(self, start_url: str, discovered_articles: List[str], max_articles: Optional[int]):
+    async def _discover_through_navigation(self, page: Page, discovered_articles: List[str], max_articles: Optional[int]):
         """Discover articles through navigation elements like 'previous article' links"""
-        page = await self.browser_manager.new_page()
-        
         try:
-            await page.goto(start_url, wait_until="networkidle", timeout=30000)
-            
-            # Look for navigation links
-            navigation_selectors = [
-                'a[href*="mp.weixin.qq.com"]:contains("上一篇")',
-                'a[href*="mp.weixin.qq.com"]:contains("下一篇")',
-                'a[href*="mp.weixin.qq.com"]:contains("往期")',
-                'a[href*="mp.weixin.qq.com"]:contains("更多")',
-                '.js_previous_article',
-                '.js_next_article'
-            ]
-            
-            for selector in navigation_selectors:
-                try:
-                    elements = await page.query_selector_all(selector)
-                    for element in elements:
-                        href = await element.get_attribute('href')
-                        if href and self._is_valid_wechat_article(href):
-                            if href not in self.discovered_urls:
-                                self.discovered_urls.add(href)
-                                discovered_articles.append(href)
-                                logger.info(f"Found navigation link: {href}")
-                                
-                                if max_articles and len(discovered_articles) >= max_articles:
-                                    return
-                except:
-                    continue
+            hrefs = await page.eval_on_selector_all(self.NAVIGATION_SELECTOR, _HREFS_JS)
+            fresh = self._add_discovered(hrefs, discovered_articles, max_articles)
+            if fresh:
+                logger.info("Found {} navigation links", len(fresh))
+                logger.debug("Navigation links: {}", fresh)
             
         except Exception as e:
-            logger.warning(f"Failed to discover through navigation: {str(e)}")
-        finally:
-            await page.close()
+            logger.warning("Failed to discover through navigation: {}", e)
     
     async def _extract_article_links_from_page(self, page: Page, discovered_articles: List[str], max_articles: Optional[int]):
         """Extract WeChat article links from the current page"""
         try:
-            # Find all WeChat article links
-            links = await page.query_selector_all('a[href*="mp.weixin.qq.com"]')
+            # Read all WeChat article hrefs in one round-trip
+            hrefs = await page.eval_on_selector_all('a[href*="mp.weixin.qq.com"]', _HREFS_JS)
             
-            for link in links:
-                href = await link.get_attribute('href')
-                if href and self._is_valid_wechat_article(href):
-                    if href not in self.discovered_urls:
-                        self.discovered_urls.add(href)
-                        discovered_articles.append(href)
-                        logger.info(f"Discovered article: {href}")
-                        
-                        if max_articles and len(discovered_articles) >= max_articles:
-                            return
+            fresh = self._add_discovered(hrefs, discovered_articles, max_articles)
+            if fresh:
+                logger.info("Discovered {} articles", len(fresh))
+                logger.debug("Discovered articles: {}", fresh)
             
         except Exception as e:
-            logger.warning(f"Failed to extract article links: {str(e)}")
+            logger.warning("Failed to extract article links: {}", e)
+    
+    def _add_discovered(self, hrefs: List[Optional[str]], discovered_articles: List[str], max_articles: Optional[int]) -> List[str]:
+        """Record the new, valid article links among hrefs, up to max_articles
+        
+        Returns:
+            The links that were added
+        """
+        # dict.fromkeys drops repeated links (in page order) before validation
+        fresh = [
+            href for href in dict.fromkeys(hrefs)
+            if href and href not in self.discovered_urls and self._is_valid_wechat_article(href)
+        ]
+        if max_articles:
+            # Another strategy may have filled part of the quota meanwhile
+            fresh = fresh[:max(max_articles - len(discovered_articles), 0)]
+        
+        self.discovered_urls.update(fresh)
+        discovered_articles.extend(fresh)
+        return fresh
     
     async def _scroll_and_load_more(self, page: Page, discovered_articles: List[str], max_articles: Optional[int]):
         """Scroll to load more articles and extract links"""
@@ -206,9 +301,15 @@ class ArticleDiscovery(CrawlerBase):
             prev_count = len(discovered_articles)
             
             for _ in range(5):  # Try scrolling 5 times
-                # Scroll to bottom
-                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await page.wait_for_timeout(2000)
+                # Scroll down with real wheel events (some profile pages lazy-load on
+                # them), then wait only until new content shows up (the page grows
+                # or more article links appear), at most 2 seconds
+                state = await page.evaluate(_CONTENT_STATE_JS)
+                await page.mouse.wheel(0, 10000)
+                try:
+                    await page.wait_for_function(_CONTENT_GREW_JS, arg=state, timeout=2000)
+                except PlaywrightTimeout:
+                    break
                 
                 # Extract new links
                 await self._extract_article_links_from_page(page, discovered_articles, max_articles)
@@ -223,34 +324,11 @@ class ArticleDiscovery(CrawlerBase):
                     break
             
         except Exception as e:
-            logger.warning(f"Failed to scroll and load more: {str(e)}")
+            logger.warning("Failed to scroll and load more: {}", e)
     
     def _is_valid_wechat_article(self, url: str) -> bool:
         """Check if URL is a valid WeChat article"""
-        try:
-            if not url or 'mp.weixin.qq.com' not in url:
-                return False
-            
-            # Parse URL to check for article pattern
-            parsed = urlparse(url)
-            if '/s/' not in parsed.path and '/s?' not in parsed.query:
-                return False
-            
-            # Skip certain types of URLs
-            skip_patterns = [
-                'action=profile',
-                'action=follow',
-                '__biz=',  # These are usually account pages, not articles
-            ]
-            
-            for pattern in skip_patterns:
-                if pattern in url:
-                    return False
-            
-            return True
-            
-        except Exception:
-            return False
+        return _is_valid_wechat_article_url(url)
     
     def get_account_name(self) -> Optional[str]:
         """Get the detected account name"""
@@ -1,52 +1,62 @@
 import asyncio
-from typing import Optional, Dict, Any
-from playwright.async_api import async_playwright, Browser, BrowserContext, Page
-from fake_useragent import UserAgent
+import random
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, List, AsyncIterator
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Route
 from utils.config import settings
 from utils.logger import logger
 
 
+# Resource types aborted when settings.block_resources is enabled: crawlers only
+# read the DOM (links, text, image URLs), never the downloaded bytes. WebSockets
+# bypass context.route entirely, and beacons are reported as "other"
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media", "stylesheet", "texttrack", "manifest"})
+
+# Resource types served from BrowserManager's in-memory cache while routing is
+# active (routing disables the browser's own HTTP cache)
+CACHED_RESOURCE_TYPES = frozenset({"script"})
+
+# WeChat in-app browser user agents, used unless settings.user_agent is set
+MOBILE_USER_AGENTS = (
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148 MicroMessenger/8.0.40(0x18002831) NetType/WIFI Language/zh_CN",
+    "Mozilla/5.0 (Linux; Android 13; SM-G991B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/112.0.0.0 Mobile Safari/537.36 MicroMessenger/8.0.40.2560(0x28002837) NetType/WIFI Language/zh_CN",
+    "Mozilla/5.0 (Linux; Android 12; Pixel 6) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Mobile Safari/537.36 MicroMessenger/8.0.40.2560(0x28002837) NetType/WIFI Language/zh_CN",
+)
+
+
 class BrowserManager:
-    """Manages Playwright browser instances for crawling"""
+    """Manages Playwright browser instances for crawling
+    
+    The Playwright driver and browser are shared by all managers in the
+    process and reference-counted; each manager only owns its own context.
+    """
+    
+    # Number of warm pages kept for reuse by page()
+    MAX_IDLE_PAGES = 3
+    
+    # Number of responses kept in the process-wide asset cache
+    MAX_CACHED_ASSETS = 256
+    _asset_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    
+    # Process-wide Playwright driver and browser, launched by the first
+    # start() and closed by the last stop()
+    _shared_playwright = None
+    _shared_browser: Optional[Browser] = None
+    _shared_refs = 0
+    _shared_lock: Optional[asyncio.Lock] = None
     
     def __init__(self):
         self.playwright = None
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
-        self.ua = UserAgent()
+        self._idle_pages: List[Page] = []
         
     async def start(self, proxy: Optional[Dict[str, Any]] = None):
         """Start the browser with specified configuration"""
         try:
-            self.playwright = await async_playwright().start()
-            
-            # Browser launch arguments
-            launch_args = {
-                "headless": settings.headless,
-                "args": [
-                    "--disable-blink-features=AutomationControlled",
-                    "--disable-features=IsolateOrigins,site-per-process",
-                    "--disable-web-security",
-                    "--disable-features=site-per-process",
-                    "--no-sandbox",
-                    "--disable-setuid-sandbox",
-                    "--disable-dev-shm-usage",
-                    "--disable-accelerated-2d-canvas",
-                    "--disable-gpu"
-                ]
-            }
-            
-            # Add proxy if provided
-            if proxy:
-                launch_args["proxy"] = proxy
-            
-            # Launch browser based on type
-            if settings.browser_type == "chromium":
-                self.browser = await self.playwright.chromium.launch(**launch_args)
-            elif settings.browser_type == "firefox":
-                self.browser = await self.playwright.firefox.launch(**launch_args)
-            else:
-                self.browser = await self.playwright.webkit.launch(**launch_args)
+            if not self.browser:
+                await self._acquire_browser()
             
             # Create context with mobile viewport
             context_options = {
@@ -66,7 +76,16 @@ class BrowserManager:
                 }
             }
             
+            # Proxies are per context, since the browser is shared
+            if proxy:
+                context_options["proxy"] = proxy
+            
             self.context = await self.browser.new_context(**context_options)
+            # Crawlers that pass no explicit goto() timeout stop waiting early
+            self.context.set_default_navigation_timeout(settings.navigation_timeout * 1000)
+            
+            if settings.block_resources:
+                await self.context.route("**/*", self._handle_route)
             
             # Add stealth scripts to avoid detection
             await self._add_stealth_scripts()
@@ -75,64 +94,176 @@ class BrowserManager:
             
         except Exception as e:
             logger.error(f"Failed to start browser: {str(e)}")
+            # The shared browser may outlive this manager, so close the half-set-up context here
+            if self.context:
+                try:
+                    await self.context.close()
+                except Exception as close_error:
+                    logger.debug(f"Failed to close context after start failure: {str(close_error)}")
+                self.context = None
+            await self._release_browser()
             raise
     
     async def stop(self):
         """Stop the browser and cleanup resources"""
         try:
+            # Idle pool pages are closed together with the context
+            self._idle_pages.clear()
             if self.context:
                 await self.context.close()
-            if self.browser:
-                await self.browser.close()
-            if self.playwright:
-                await self.playwright.stop()
+                self.context = None
+            await self._release_browser()
             logger.info("Browser stopped successfully")
         except Exception as e:
             logger.error(f"Error stopping browser: {str(e)}")
     
+    @classmethod
+    def _lock(cls) -> asyncio.Lock:
+        """Get the lock guarding the shared browser, creating it on first use"""
+        if cls._shared_lock is None:
+            cls._shared_lock = asyncio.Lock()
+        return cls._shared_lock
+    
+    async def _acquire_browser(self):
+        """Take a reference to the shared browser, launching it if needed"""
+        cls = BrowserManager
+        async with self._lock():
+            if cls._shared_browser is None:
+                cls._shared_playwright = await async_playwright().start()
+                try:
+                    cls._shared_browser = await self._launch_browser(cls._shared_playwright)
+                except Exception:
+                    await cls._shared_playwright.stop()
+                    cls._shared_playwright = None
+                    raise
+            cls._shared_refs += 1
+            self.playwright = cls._shared_playwright
+            self.browser = cls._shared_browser
+    
+    async def _release_browser(self):
+        """Drop this manager's reference, closing the browser on the last one"""
+        if not self.browser:
+            return
+        
+        cls = BrowserManager
+        async with self._lock():
+            self.playwright = None
+            self.browser = None
+            cls._shared_refs -= 1
+            if cls._shared_refs > 0:
+                return
+            
+            browser, playwright = cls._shared_browser, cls._shared_playwright
+            cls._shared_browser = None
+            cls._shared_playwright = None
+            try:
+                await browser.close()
+            finally:
+                await playwright.stop()
+    
+    async def _launch_browser(self, playwright) -> Browser:
+        """Launch the browser configured in settings"""
+        # Browser launch arguments
+        launch_args = {
+            "headless": settings.headless,
+            "args": [
+                "--disable-blink-features=AutomationControlled",
+                "--disable-features=IsolateOrigins,site-per-process",
+                "--disable-web-security",
+                "--disable-features=site-per-process",
+                "--no-sandbox",
+                "--disable-setuid-sandbox",
+                "--disable-dev-shm-usage",
+                "--disable-accelerated-2d-canvas",
+                "--disable-gpu"
+            ]
+        }
+        
+        # Launch browser based on type
+        if settings.browser_type == "chromium":
+            return await playwright.chromium.launch(**launch_args)
+        elif settings.browser_type == "firefox":
+            return await playwright.firefox.launch(**launch_args)
+        else:
+            return await playwright.webkit.launch(**launch_args)
+    
     async def new_page(self) -> Page:
         """Create a new page in the browser context"""
         if not self.context:
             raise RuntimeError("Browser context not initialized")
         
-        page = await self.context.new_page()
+        return await self.context.new_page()
+    
+    async def _handle_route(self, route: Route):
+        """Abort requests for resources the crawlers never read, serve repeated scripts from cache"""
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+            return
+        if request.method != "GET" or request.resource_type not in CACHED_RESOURCE_TYPES:
+            await route.continue_()
+            return
         
-        # Add page-level stealth
-        await page.add_init_script("""
-            // Override navigator properties
-            Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
-            Object.defineProperty(navigator, 'plugins', { get: () => [1, 2, 3, 4, 5] });
-            Object.defineProperty(navigator, 'languages', { get: () => ['zh-CN', 'zh'] });
-            
-            // Override chrome property
-            window.chrome = { runtime: {} };
-            
-            // Override permissions
-            const originalQuery = window.navigator.permissions.query;
-            window.navigator.permissions.query = (parameters) => (
-                parameters.name === 'notifications' ?
-                Promise.resolve({ state: Notification.permission }) :
-                originalQuery(parameters)
-            );
-        """)
+        cache = BrowserManager._asset_cache
+        cached = cache.get(request.url)
+        if cached is not None:
+            cache.move_to_end(request.url)
+            await route.fulfill(**cached)
+            return
+        
+        try:
+            response = await route.fetch()
+        except Exception as e:
+            logger.debug(f"Fetching {request.url} failed, continuing uncached: {str(e)}")
+            await route.continue_()
+            return
         
-        return page
+        if response.status == 200:
+            cache[request.url] = {
+                "status": response.status,
+                "headers": response.headers,
+                "body": await response.body()
+            }
+            if len(cache) > self.MAX_CACHED_ASSETS:
+                cache.popitem(last=False)
+        await route.fulfill(response=response)
     
-    def _get_mobile_user_agent(self) -> str:
-        """Get a mobile user agent string"""
-        mobile_agents = [
-            "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148 MicroMessenger/8.0.40(0x18002831) NetType/WIFI Language/zh_CN",
-            "Mozilla/5.0 (Linux; Android 13; SM-G991B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/112.0.0.0 Mobile Safari/537.36 MicroMessenger/8.0.40.2560(0x28002837) NetType/WIFI Language/zh_CN",
-            "Mozilla/5.0 (Linux; Android 12; Pixel 6) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Mobile Safari/537.36 MicroMessenger/8.0.40.2560(0x28002837) NetType/WIFI Language/zh_CN"
-        ]
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """Borrow a page, reusing a warm one from the pool when available
+        
+        The page is reset to about:blank and returned to the pool afterwards,
+        so repeated tasks skip page creation.
+        """
+        page = self._idle_pages.pop() if self._idle_pages else await self.new_page()
+        try:
+            yield page
+        finally:
+            await self._release_page(page)
+    
+    async def _release_page(self, page: Page):
+        """Return a borrowed page to the pool, or close it if the pool is full"""
+        if page.is_closed():
+            return
         
-        # Try to get WeChat-specific user agent
         try:
-            return self.ua.random
-        except:
-            # Fallback to predefined mobile agents
-            import random
-            return random.choice(mobile_agents)
+            if len(self._idle_pages) < self.MAX_IDLE_PAGES:
+                await page.goto("about:blank")
+                self._idle_pages.append(page)
+            else:
+                await page.close()
+        except Exception as e:
+            logger.debug(f"Discarding page that could not be reset: {str(e)}")
+            # Runs in page()'s finally: never let a failed close (closed context,
+            # crashed page) replace the exception raised by the caller's block
+            try:
+                await page.close()
+            except Exception as e:
+                logger.debug(f"Failed to close discarded page: {str(e)}")
+    
+    def _get_mobile_user_agent(self) -> str:
+        """Get a mobile user agent string"""
+        return random.choice(MOBILE_USER_AGENTS)
     
     async def _add_stealth_scripts(self):
         """Add stealth scripts to the context"""
@@ -149,6 +280,19 @@ class BrowserManager:
                 ]
             });
             
+            Object.defineProperty(navigator, 'languages', { get: () => ['zh-CN', 'zh'] });
+            
+            // Override chrome property
+            window.chrome = { runtime: {} };
+            
+            // Override permissions
+            const originalQuery = window.navigator.permissions.query;
+            window.navigator.permissions.query = (parameters) => (
+                parameters.name === 'notifications' ?
+                Promise.resolve({ state: Notification.permission }) :
+                originalQuery(parameters)
+            );
+            
             // Mock WebGL vendor
             const getParameter = WebGLRenderingContext.prototype.getParameter;
             WebGLRenderingContext.prototype.getParameter = function(parameter) {
@@ -1,13 +1,141 @@
 import asyncio
 import re
 import json
+from functools import lru_cache
 from typing import List, Dict, Optional, Set
 from urllib.parse import urljoin, urlparse, parse_qs
-from playwright.async_api import Page
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeout
 from crawler.browser import CrawlerBase
 from utils.logger import logger
 
 
+# 文章链接标识：/s/ 或 /s?
+_ARTICLE_PATH_RE = re.compile(r'/s[/?]')
+
+# 需要排除的URL：账号主页、关注页、分享场景、账号页面、临时链接
+_EXCLUDE_URL_RE = re.compile(r'action=profile|action=follow|scene=|__biz=|tempkey=')
+
+# 一次性读取页面上所有微信文章链接的 href（原始属性值）、文本，以及标题元素的文本（没有则为链接文本）
+_ARTICLE_LINKS_JS = """() => Array.from(document.querySelectorAll('a[href*="mp.weixin.qq.com"]'), link => {
+    const titleElement = link.querySelector('h3, h4, .title, .article-title');
+    return {
+        href: link.getAttribute('href'),
+        text: link.textContent,
+        title: titleElement ? titleElement.textContent : link.textContent
+    };
+})"""
+
+# 页面高度和微信文章链接数，供 _CONTENT_GREW_JS 判断是否加载了新内容
+_CONTENT_STATE_JS = """() => [
+    document.body.scrollHeight,
+    document.querySelectorAll('a[href*="mp.weixin.qq.com"]').length
+]"""
+
+# 记录当前状态后滚动到底部
+_SCROLL_TO_BOTTOM_JS = """() => {
+    const state = (""" + _CONTENT_STATE_JS + """)();
+    window.scrollTo(0, document.body.scrollHeight);
+    return state;
+}"""
+
+# 页面比 state 记录时更高，或文章链接更多
+_CONTENT_GREW_JS = """([height, links]) =>
+    document.body.scrollHeight > height ||
+    document.querySelectorAll('a[href*="mp.weixin.qq.com"]').length > links"""
+
+# 起始文章页面一次性需要的全部数据：
+#   account: 账号名称、描述、微信号（各取第一个匹配的选择器并去掉首尾空白，未找到为 null）
+#   profile_href: 账号主页链接（第一个带 href 的匹配元素）
+#   history_href: "查看历史消息"等链接，按文本优先、再按 href 关键字查找
+#   location: 用于解析上面两个链接的页面地址
+#   links: 同 _ARTICLE_LINKS_JS
+#   js_data: JS 变量中的推荐/同作者/历史文章，以及推荐阅读元素
+_START_PAGE_JS = """() => {
+    const firstText = (selectors) => {
+        for (const selector of selectors) {
+            const element = document.querySelector(selector);
+            if (element) return element.textContent.trim();
+        }
+        return null;
+    };
+    const firstHref = (selectors) => {
+        for (const selector of selectors) {
+            const href = document.querySelector(selector)?.getAttribute('href');
+            if (href) return href;
+        }
+        return null;
+    };
+    const historyHref = () => {
+        const anchors = Array.from(document.querySelectorAll('a'));
+        for (const text of ['查看历史消息', '历史消息', '更多文章']) {
+            const href = anchors.find(a => a.textContent.includes(text))?.getAttribute('href');
+            if (href) return href;
+        }
+        return firstHref(['a[href*="history"]', 'a[href*="msglist"]']);
+    };
+    
+    const jsData = {};
+    
+    // 查找推荐文章
+    if (window.related_article_list) {
+        jsData.related_articles = window.related_article_list;
+    }
+    
+    // 查找同一作者的其他文章
+    if (window.author_articles) {
+        jsData.author_articles = window.author_articles;
+    }
+    
+    // 查找历史文章数据
+    if (window.history_articles) {
+        jsData.history_articles = window.history_articles;
+    }
+    
+    // 查找推荐阅读
+    jsData.recommendations = [];
+    document.querySelectorAll('[data-role="recommend"]').forEach(el => {
+        const link = el.querySelector('a[href*="mp.weixin.qq.com"]');
+        if (link) {
+            jsData.recommendations.push({
+                url: link.href,
+                title: link.textContent || el.textContent
+            });
+        }
+    });
+    
+    return {
+        account: {
+            name: firstText(['#js_name', 'strong.profile_nickname', '.account_nickname']),
+            description: firstText(['#js_profile_desc', '.profile_desc']),
+            wechat_id: firstText(['#js_wechat_id', '.profile_wechat_id'])
+        },
+        profile_href: firstHref(['a#js_name', 'a[href*="profile"]', 'strong#profileBt a', '.profile_link a']),
+        history_href: historyHref(),
+        location: location.href,
+        links: (""" + _ARTICLE_LINKS_JS + """)(),
+        js_data: jsData
+    };
+}"""
+
+
+@lru_cache(maxsize=4096)
+def _is_valid_article_url(url: str) -> bool:
+    """检查是否为有效的文章URL（结果缓存：同一链接会在多个页面和多次滚动中反复出现）"""
+    try:
+        if not url or 'mp.weixin.qq.com' not in url:
+            return False
+        
+        # 必须包含文章标识
+        if not _ARTICLE_PATH_RE.search(url):
+            return False
+        
+        # 排除某些类型的URL
+        return _EXCLUDE_URL_RE.search(url) is None
+        
+    except Exception:
+        return False
+
+
 class HistoryCrawler(CrawlerBase):
     """专门用于获取微信公众号历史文章的爬虫"""
     
@@ -32,17 +160,30 @@ class HistoryCrawler(CrawlerBase):
         try:
             logger.info(f"开始从文章获取历史记录: {start_url}")
             
-            # 方法1: 通过文章页面的账号链接
-            account_articles = await self._get_articles_from_account_page(start_url, max_articles)
-            history_articles.extend(account_articles)
+            # 起始文章只加载一次，账号信息、链接和JS数据一次性取回
+            start_data = await self._load_start_page(start_url)
+            self._extract_account_info(start_data['account'])
+            
+            # 方法1: 通过账号主页和"查看历史消息"链接，两个页面并发爬取
+            follow_ups = []
+            profile_href = start_data['profile_href']
+            if profile_href:
+                account_link = urljoin(start_data['location'], profile_href)
+                logger.info(f"找到账号主页链接: {account_link}")
+                follow_ups.append(self._crawl_account_profile(account_link, max_articles))
+            history_href = start_data['history_href']
+            if history_href:
+                history_link = urljoin(start_data['location'], history_href)
+                logger.info(f"找到历史消息链接: {history_link}")
+                follow_ups.append(self._crawl_history_page(history_link, max_articles))
+            
+            history_articles.extend(await self._crawl_follow_ups(follow_ups, max_articles))
             
             # 方法2: 通过文章内的相关链接
-            related_articles = await self._get_articles_from_content_links(start_url, max_articles)
-            history_articles.extend(related_articles)
+            history_articles.extend(self._get_articles_from_content_links(start_data['links'], max_articles))
             
             # 方法3: 通过JS变量中的推荐文章
-            js_articles = await self._get_articles_from_js_data(start_url, max_articles)
-            history_articles.extend(js_articles)
+            history_articles.extend(self._get_articles_from_js_data(start_data['js_data'], max_articles))
             
             # 去重
             unique_articles = self._deduplicate_articles(history_articles)
@@ -54,262 +195,121 @@ class HistoryCrawler(CrawlerBase):
             logger.error(f"获取历史文章失败: {str(e)}")
             return history_articles
     
-    async def _get_articles_from_account_page(self, start_url: str, max_articles: Optional[int]) -> List[Dict]:
-        """通过公众号页面获取文章列表"""
-        articles = []
-        page = await self.browser_manager.new_page()
+    async def _crawl_follow_ups(self, follow_ups: List, max_articles: Optional[int]) -> List[Dict]:
+        """并发爬取账号主页/历史消息页面；已完成的页面凑够 max_articles 篇不同文章后取消其余页面
         
+        Returns:
+            已完成页面的文章，按 follow_ups 的顺序合并
+        """
+        tasks = [asyncio.ensure_future(follow_up) for follow_up in follow_ups]
+        pending = set(tasks)
         try:
-            await page.goto(start_url, wait_until="domcontentloaded", timeout=60000)
-            logger.info("页面加载完成，开始查找账号信息")
-            
-            # 提取账号信息
-            await self._extract_account_info(page)
-            
-            # 查找账号主页链接
-            account_link = await self._find_account_profile_link(page)
-            
-            if account_link:
-                logger.info(f"找到账号主页链接: {account_link}")
-                # 访问账号主页获取文章列表
-                profile_articles = await self._crawl_account_profile(account_link, max_articles)
-                articles.extend(profile_articles)
-            
-            # 查找"查看历史消息"链接
-            history_link = await self._find_history_link(page)
-            if history_link:
-                logger.info(f"找到历史消息链接: {history_link}")
-                history_articles = await self._crawl_history_page(history_link, max_articles)
-                articles.extend(history_articles)
-            
-        except Exception as e:
-            logger.error(f"从账号页面获取文章失败: {str(e)}")
+            while pending:
+                _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if pending and max_articles:
+                    collected = {
+                        article['url']
+                        for task in tasks if task.done() and not task.cancelled() and not task.exception()
+                        for article in task.result()
+                    }
+                    if len(collected) >= max_articles:
+                        logger.info(f"已获取 {max_articles} 篇文章，停止其余页面的爬取")
+                        break
         finally:
-            await page.close()
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        
+        articles = []
+        for task in tasks:
+            if task.cancelled():
+                continue
+            if task.exception():
+                logger.error(f"从账号页面获取文章失败: {str(task.exception())}")
+            else:
+                articles.extend(task.result())
+        return articles
+    
+    async def _load_start_page(self, start_url: str) -> Dict:
+        """加载起始文章，返回页面数据（见 _START_PAGE_JS）"""
+        async with self.browser_manager.page() as page:
+            await page.goto(start_url, wait_until="domcontentloaded", timeout=60000)
+            logger.info("页面加载完成，开始提取账号信息和文章链接")
             
+            return await page.evaluate(_START_PAGE_JS)
+    
+    def _get_articles_from_content_links(self, links: List[Dict], max_articles: Optional[int]) -> List[Dict]:
+        """从文章内容的链接中提取相关文章"""
+        articles = []
+        
+        for link in links:
+            href = link['href']
+            if href and _is_valid_article_url(href):
+                articles.append({
+                    'url': href,
+                    'title': link['text'] or '',
+                    'source': 'content_link'
+                })
+                
+                if max_articles and len(articles) >= max_articles:
+                    break
+        
+        logger.info(f"从内容链接发现 {len(articles)} 篇文章")
         return articles
     
-    async def _get_articles_from_content_links(self, start_url: str, max_articles: Optional[int]) -> List[Dict]:
-        """从文章内容中提取相关文章链接"""
+    def _get_articles_from_js_data(self, js_data: Dict, max_articles: Optional[int]) -> List[Dict]:
+        """从页面JS数据中提取相关文章"""
         articles = []
-        page = await self.browser_manager.new_page()
         
-        try:
-            await page.goto(start_url, wait_until="domcontentloaded", timeout=60000)
-            
-            # 查找所有微信文章链接
-            links = await page.query_selector_all('a[href*="mp.weixin.qq.com"]')
-            
-            for link in links:
-                try:
-                    href = await link.get_attribute('href')
-                    text = await link.text_content()
-                    
-                    if href and self._is_valid_article_url(href):
+        for key, article_list in js_data.items():
+            if isinstance(article_list, list):
+                for article in article_list:
+                    if isinstance(article, dict) and 'url' in article:
                         articles.append({
-                            'url': href,
-                            'title': text or '',
-                            'source': 'content_link'
+                            'url': article['url'],
+                            'title': article.get('title', ''),
+                            'source': f'js_{key}'
                         })
                         
                         if max_articles and len(articles) >= max_articles:
                             break
-                            
-                except Exception as e:
-                    continue
-            
-            logger.info(f"从内容链接发现 {len(articles)} 篇文章")
-            
-        except Exception as e:
-            logger.error(f"从内容链接获取文章失败: {str(e)}")
-        finally:
-            await page.close()
-            
-        return articles
-    
-    async def _get_articles_from_js_data(self, start_url: str, max_articles: Optional[int]) -> List[Dict]:
-        """从页面JS数据中提取相关文章"""
-        articles = []
-        page = await self.browser_manager.new_page()
         
-        try:
-            await page.goto(start_url, wait_until="domcontentloaded", timeout=60000)
-            
-            # 执行JS代码提取相关数据
-            js_data = await page.evaluate("""
-                () => {
-                    const data = {};
-                    
-                    // 查找推荐文章
-                    if (window.related_article_list) {
-                        data.related_articles = window.related_article_list;
-                    }
-                    
-                    // 查找同一作者的其他文章
-                    if (window.author_articles) {
-                        data.author_articles = window.author_articles;
-                    }
-                    
-                    // 查找历史文章数据
-                    if (window.history_articles) {
-                        data.history_articles = window.history_articles;
-                    }
-                    
-                    // 查找推荐阅读
-                    const recommendElements = document.querySelectorAll('[data-role="recommend"]');
-                    data.recommendations = [];
-                    recommendElements.forEach(el => {
-                        const link = el.querySelector('a[href*="mp.weixin.qq.com"]');
-                        if (link) {
-                            data.recommendations.push({
-                                url: link.href,
-                                title: link.textContent || el.textContent
-                            });
-                        }
-                    });
-                    
-                    return data;
-                }
-            """)
-            
-            # 处理JS数据中的文章
-            for key, article_list in js_data.items():
-                if isinstance(article_list, list):
-                    for article in article_list:
-                        if isinstance(article, dict) and 'url' in article:
-                            articles.append({
-                                'url': article['url'],
-                                'title': article.get('title', ''),
-                                'source': f'js_{key}'
-                            })
-                            
-                            if max_articles and len(articles) >= max_articles:
-                                break
-            
-            logger.info(f"从JS数据发现 {len(articles)} 篇文章")
-            
-        except Exception as e:
-            logger.error(f"从JS数据获取文章失败: {str(e)}")
-        finally:
-            await page.close()
-            
+        logger.info(f"从JS数据发现 {len(articles)} 篇文章")
         return articles
     
-    async def _extract_account_info(self, page: Page):
-        """提取账号信息"""
-        try:
-            # 账号名称
-            name_selectors = ['#js_name', 'strong.profile_nickname', '.account_nickname']
-            for selector in name_selectors:
-                element = await page.query_selector(selector)
-                if element:
-                    self.account_info['name'] = await element.text_content()
-                    break
-            
-            # 账号描述
-            desc_selectors = ['#js_profile_desc', '.profile_desc']
-            for selector in desc_selectors:
-                element = await page.query_selector(selector)
-                if element:
-                    self.account_info['description'] = await element.text_content()
-                    break
-            
-            # 微信号
-            wechat_id_selectors = ['#js_wechat_id', '.profile_wechat_id']
-            for selector in wechat_id_selectors:
-                element = await page.query_selector(selector)
-                if element:
-                    self.account_info['wechat_id'] = await element.text_content()
-                    break
-            
-            logger.info(f"账号信息: {self.account_info}")
-            
-        except Exception as e:
-            logger.warning(f"提取账号信息失败: {str(e)}")
-    
-    async def _find_account_profile_link(self, page: Page) -> Optional[str]:
-        """查找账号主页链接"""
-        try:
-            # 常见的账号链接选择器
-            profile_selectors = [
-                'a#js_name',
-                'a[href*="profile"]',
-                'strong#profileBt a',
-                '.profile_link a'
-            ]
-            
-            for selector in profile_selectors:
-                element = await page.query_selector(selector)
-                if element:
-                    href = await element.get_attribute('href')
-                    if href:
-                        return urljoin(page.url, href)
-            
-        except Exception as e:
-            logger.warning(f"查找账号链接失败: {str(e)}")
-            
-        return None
-    
-    async def _find_history_link(self, page: Page) -> Optional[str]:
-        """查找历史消息链接"""
-        try:
-            # 查找"查看历史消息"或类似的链接
-            history_patterns = [
-                'a:text("查看历史消息")',
-                'a:text("历史消息")',
-                'a:text("更多文章")',
-                'a[href*="history"]',
-                'a[href*="msglist"]'
-            ]
-            
-            for pattern in history_patterns:
-                try:
-                    element = await page.wait_for_selector(pattern, timeout=2000)
-                    if element:
-                        href = await element.get_attribute('href')
-                        if href:
-                            return urljoin(page.url, href)
-                except:
-                    continue
-            
-        except Exception as e:
-            logger.warning(f"查找历史消息链接失败: {str(e)}")
-            
-        return None
+    def _extract_account_info(self, account: Dict):
+        """记录页面上找到的账号信息（名称、描述、微信号）"""
+        self.account_info.update({key: value for key, value in account.items() if value})
+        
+        logger.info(f"账号信息: {self.account_info}")
     
     async def _crawl_account_profile(self, profile_url: str, max_articles: Optional[int]) -> List[Dict]:
         """爬取账号主页的文章"""
         articles = []
-        page = await self.browser_manager.new_page()
-        
         try:
-            await page.goto(profile_url, wait_until="domcontentloaded", timeout=60000)
-            
-            # 滚动加载更多文章
-            await self._scroll_and_collect_articles(page, articles, max_articles)
-            
+            async with self.browser_manager.page() as page:
+                await page.goto(profile_url, wait_until="domcontentloaded", timeout=60000)
+                
+                # 滚动加载更多文章
+                await self._scroll_and_collect_articles(page, articles, max_articles)
+                
         except Exception as e:
             logger.error(f"爬取账号主页失败: {str(e)}")
-        finally:
-            await page.close()
             
         return articles
     
     async def _crawl_history_page(self, history_url: str, max_articles: Optional[int]) -> List[Dict]:
         """爬取历史消息页面"""
         articles = []
-        page = await self.browser_manager.new_page()
-        
         try:
-            await page.goto(history_url, wait_until="domcontentloaded", timeout=60000)
-            
-            # 滚动加载更多历史文章
-            await self._scroll_and_collect_articles(page, articles, max_articles)
-            
+            async with self.browser_manager.page() as page:
+                await page.goto(history_url, wait_until="domcontentloaded", timeout=60000)
+                
+                # 滚动加载更多历史文章
+                await self._scroll_and_collect_articles(page, articles, max_articles)
+                
         except Exception as e:
             logger.error(f"爬取历史消息页面失败: {str(e)}")
-        finally:
-            await page.close()
             
         return articles
     
@@ -319,29 +319,25 @@ class HistoryCrawler(CrawlerBase):
             last_count = 0
             scroll_attempts = 0
             max_scrolls = 10
+            # 已收集的URL，避免每个链接都线性扫描 articles
+            seen_urls = {a['url'] for a in articles}
             
             while scroll_attempts < max_scrolls:
-                # 收集当前页面的文章链接
-                links = await page.query_selector_all('a[href*="mp.weixin.qq.com"]')
+                # 一次往返收集当前页面的文章链接
+                links = await page.evaluate(_ARTICLE_LINKS_JS)
                 
                 for link in links:
-                    try:
-                        href = await link.get_attribute('href')
-                        title_element = await link.query_selector('h3, h4, .title, .article-title')
-                        title = await title_element.text_content() if title_element else await link.text_content()
+                    href = link['href']
+                    if href and href not in seen_urls and _is_valid_article_url(href):
+                        seen_urls.add(href)
+                        articles.append({
+                            'url': href,
+                            'title': link['title'] or '',
+                            'source': 'profile_scroll'
+                        })
                         
-                        if href and self._is_valid_article_url(href) and href not in [a['url'] for a in articles]:
-                            articles.append({
-                                'url': href,
-                                'title': title or '',
-                                'source': 'profile_scroll'
-                            })
-                            
-                            if max_articles and len(articles) >= max_articles:
-                                return
-                                
-                    except Exception as e:
-                        continue
+                        if max_articles and len(articles) >= max_articles:
+                            return
                 
                 # 检查是否有新文章
                 if len(articles) == last_count:
@@ -350,62 +346,38 @@ class HistoryCrawler(CrawlerBase):
                     scroll_attempts = 0
                     last_count = len(articles)
                 
-                # 滚动到底部
-                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await page.wait_for_timeout(2000)
+                # 滚动到底部，新内容出现即继续，最多等待2秒
+                state = await page.evaluate(_SCROLL_TO_BOTTOM_JS)
+                await self._wait_for_new_content(page, state, 2000)
                 
-                # 尝试点击"加载更多"按钮
+                # 尝试点击"加载更多"按钮，同样等到新内容出现，最多3秒
                 try:
                     load_more = await page.query_selector('a:text("加载更多"), button:text("加载更多"), .load-more')
                     if load_more:
+                        state = await page.evaluate(_CONTENT_STATE_JS)
                         await load_more.click()
-                        await page.wait_for_timeout(3000)
+                        await self._wait_for_new_content(page, state, 3000)
                 except:
                     pass
             
         except Exception as e:
             logger.warning(f"滚动收集文章失败: {str(e)}")
     
-    def _is_valid_article_url(self, url: str) -> bool:
-        """检查是否为有效的文章URL"""
+    async def _wait_for_new_content(self, page: Page, state: List[int], timeout: int):
+        """等待页面变高或出现更多文章链接（相对于 state），超时不视为错误"""
         try:
-            if not url or 'mp.weixin.qq.com' not in url:
-                return False
-            
-            # 必须包含文章标识
-            if '/s/' not in url and '/s?' not in url:
-                return False
-            
-            # 排除某些类型的URL
-            exclude_patterns = [
-                'action=profile',
-                'action=follow',
-                'scene=',  # 分享场景
-                '__biz=',  # 账号页面
-                'tempkey='  # 临时链接
-            ]
-            
-            for pattern in exclude_patterns:
-                if pattern in url:
-                    return False
-            
-            return True
-            
-        except Exception:
-            return False
+            await page.wait_for_function(_CONTENT_GREW_JS, arg=state, timeout=timeout)
+        except PlaywrightTimeout:
+            pass
     
     def _deduplicate_articles(self, articles: List[Dict]) -> List[Dict]:
         """去除重复文章"""
-        seen_urls = set()
-        unique_articles = []
-        
+        # 按URL保留第一次出现的文章，dict 保持插入顺序
+        unique_articles = {}
         for article in articles:
-            url = article['url']
-            if url not in seen_urls:
-                seen_urls.add(url)
-                unique_articles.append(article)
+            unique_articles.setdefault(article['url'], article)
         
-        return unique_articles
+        return list(unique_articles.values())
     
     def get_account_info(self) -> Dict:
         """获取账号信息"""
@@ -1664,7 +1664,7 @@ async def discover_from_article(article_url: str, max_articles: Optional[int] =
             await proxy_manager.initialize()
         
         # Discover articles starting from the given URL
-        async with ArticleDiscovery() as discovery:
+        async with ArticleDiscovery(db=db) as discovery:
             # Set proxy if available
             if proxy_manager:
                 proxy = proxy_manager.get_next_proxy()
@@ -1,9 +1,9 @@
 import os
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set
 from contextlib import contextmanager
 from sqlalchemy import create_engine, and_, or_, desc
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import IntegrityError, OperationalError
 from pymongo import MongoClient
 from pymongo.errors import DuplicateKeyError
 from storage.models import Base, ArticleDB, CrawlJobDB, Article, CrawlJob
@@ -11,6 +11,35 @@ from utils.config import settings
 from utils.logger import logger
 
 
+# Full-text index over article titles and content (FTS5 trigram tokenizer, so
+# MATCH finds any substring like LIKE '%kw%'), kept in sync by triggers
+ARTICLES_FTS_SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+        title, content, content='articles', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE OF title, content ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO articles_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+)
+
+
 class DatabaseManager:
     """Manages database connections and operations"""
     
@@ -33,6 +62,8 @@ class DatabaseManager:
         self.articles_collection.create_index("url", unique=True)
         self.articles_collection.create_index("account_name")
         self.articles_collection.create_index("publish_time")
+        self.articles_collection.create_index("crawl_time")
+        self.articles_collection.create_index([("author", 1), ("crawl_time", 1)])
         self.jobs_collection.create_index("account_name")
         self.jobs_collection.create_index("status")
         
@@ -45,10 +76,35 @@ class DatabaseManager:
         
         self.engine = create_engine(f'sqlite:///{db_path}', echo=False)
         Base.metadata.create_all(self.engine)
+        # create_all only creates indexes together with new tables; add any
+        # indexes missing from databases created by older versions
+        for index in ArticleDB.__table__.indexes:
+            index.create(self.engine, checkfirst=True)
+        if settings.sqlite_fts:
+            self._init_articles_fts()
         self.SessionLocal = sessionmaker(bind=self.engine)
         
         logger.info("SQLite initialized successfully")
     
+    def _init_articles_fts(self):
+        """Create the articles_fts full-text index and its sync triggers if missing"""
+        try:
+            with self.engine.begin() as conn:
+                exists = conn.exec_driver_sql(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'"
+                ).first()
+                if exists:
+                    return
+                
+                for statement in ARTICLES_FTS_SCHEMA:
+                    conn.exec_driver_sql(statement)
+                # Index existing articles once; the triggers keep it in sync afterwards
+                conn.exec_driver_sql("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+            logger.info("Created full-text index articles_fts")
+        except OperationalError as e:
+            # e.g. SQLite builds without FTS5 or the trigram tokenizer (< 3.34)
+            logger.warning(f"Could not create full-text index, keyword search uses LIKE: {str(e)}")
+    
     @contextmanager
     def get_session(self) -> Session:
         """Get SQLite session context manager"""
@@ -163,6 +219,18 @@ class DatabaseManager:
             logger.error(f"Failed to search articles: {str(e)}")
             return []
     
+    def get_article_urls(self) -> Set[str]:
+        """Get the URLs of all stored articles"""
+        try:
+            if self.use_mongodb:
+                return {doc["url"] for doc in self.articles_collection.find({}, {"_id": 0, "url": 1})}
+            else:
+                with self.get_session() as session:
+                    return {url for (url,) in session.query(ArticleDB.url)}
+        except Exception as e:
+            logger.error(f"Failed to get article URLs: {str(e)}")
+            return set()
+    
     def get_article_count(self, account_name: Optional[str] = None) -> int:
         """Get total article count"""
         try:
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel, Field, HttpUrl
-from sqlalchemy import Column, String, Text, Integer, DateTime, Float, JSON
+from sqlalchemy import Column, String, Text, Integer, DateTime, Float, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
@@ -42,16 +42,21 @@ class ArticleDB(Base):
     content = Column(Text, nullable=False)
     author = Column(String(200))
     account_name = Column(String(200), index=True)
-    publish_time = Column(DateTime)
+    publish_time = Column(DateTime, index=True)
     images = Column(JSON)  # Store as JSON array
     cover_image = Column(String(500))
     read_count = Column(Integer, default=0)
     like_count = Column(Integer, default=0)
     comment_count = Column(Integer, default=0)
     raw_html = Column(Text)
-    crawl_time = Column(DateTime, default=datetime.now)
+    crawl_time = Column(DateTime, default=datetime.now, index=True)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
     
+    # Analytics queries filter by crawl_time window, per author
+    __table_args__ = (
+        Index('idx_articles_author_crawl_time', 'author', 'crawl_time'),
+    )
+    
     def to_dict(self):
         """Convert to dictionary"""
         return {
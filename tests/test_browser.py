@@ -0,0 +1,111 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from crawler.browser import BrowserManager
+
+
+def _mock_playwright():
+    """Build a fake async_playwright() whose chromium launches a fake browser"""
+    context = MagicMock()
+    context.route = AsyncMock()
+    context.add_init_script = AsyncMock()
+    context.close = AsyncMock()
+    
+    browser = MagicMock()
+    browser.new_context = AsyncMock(return_value=context)
+    browser.close = AsyncMock()
+    
+    playwright = MagicMock()
+    playwright.chromium.launch = AsyncMock(return_value=browser)
+    playwright.firefox.launch = playwright.chromium.launch
+    playwright.webkit.launch = playwright.chromium.launch
+    playwright.stop = AsyncMock()
+    
+    factory = MagicMock()
+    factory.return_value.start = AsyncMock(return_value=playwright)
+    return factory, playwright, browser
+
+
+class SharedBrowserTest(unittest.IsolatedAsyncioTestCase):
+    """Reference-counted process-wide browser shared by BrowserManager instances"""
+    
+    def setUp(self):
+        self._reset_shared_state()
+        self.factory, self.playwright, self.browser = _mock_playwright()
+        patcher = patch("crawler.browser.async_playwright", self.factory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self._reset_shared_state)
+    
+    @staticmethod
+    def _reset_shared_state():
+        BrowserManager._shared_playwright = None
+        BrowserManager._shared_browser = None
+        BrowserManager._shared_refs = 0
+        BrowserManager._shared_lock = None
+    
+    async def test_managers_share_one_launch(self):
+        first, second = BrowserManager(), BrowserManager()
+        await first.start()
+        await second.start()
+        
+        self.assertEqual(self.factory.call_count, 1)
+        self.assertEqual(self.playwright.chromium.launch.await_count, 1)
+        self.assertIs(first.browser, second.browser)
+        self.assertEqual(BrowserManager._shared_refs, 2)
+        # Each manager still gets its own context
+        self.assertEqual(self.browser.new_context.await_count, 2)
+    
+    async def test_last_stop_closes_browser_and_driver(self):
+        first, second = BrowserManager(), BrowserManager()
+        await first.start()
+        await second.start()
+        
+        await first.stop()
+        self.browser.close.assert_not_awaited()
+        self.playwright.stop.assert_not_awaited()
+        
+        # A repeated stop must not release the reference twice
+        await first.stop()
+        self.assertEqual(BrowserManager._shared_refs, 1)
+        
+        await second.stop()
+        self.browser.close.assert_awaited_once()
+        self.playwright.stop.assert_awaited_once()
+        self.assertEqual(BrowserManager._shared_refs, 0)
+        self.assertIsNone(BrowserManager._shared_browser)
+        self.assertIsNone(BrowserManager._shared_playwright)
+    
+    async def test_failed_launch_leaves_no_reference(self):
+        self.playwright.chromium.launch.side_effect = RuntimeError("launch failed")
+        manager = BrowserManager()
+        
+        with self.assertRaises(RuntimeError):
+            await manager.start()
+        
+        self.assertEqual(BrowserManager._shared_refs, 0)
+        self.assertIsNone(BrowserManager._shared_browser)
+        self.assertIsNone(manager.browser)
+        self.playwright.stop.assert_awaited_once()
+
+    
+    async def test_failed_setup_closes_context(self):
+        holder = BrowserManager()
+        await holder.start()
+        context = self.browser.new_context.return_value
+        context.route.side_effect = RuntimeError("route failed")
+        manager = BrowserManager()
+        
+        with self.assertRaises(RuntimeError):
+            await manager.start()
+        
+        context.close.assert_awaited_once()
+        self.assertIsNone(manager.context)
+        self.assertIsNone(manager.browser)
+        # The other manager keeps the shared browser open
+        self.assertEqual(BrowserManager._shared_refs, 1)
+        self.browser.close.assert_not_awaited()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import analytics.trend_analyzer as trend_analyzer
+from analytics.trend_analyzer import TrendAnalyzer, _REPORT_CACHE_TTL, _report_cache
+
+
+class ReportCacheTest(unittest.TestCase):
+    """综合趋势报告缓存：数据版本变化或 TTL 过期时重新计算"""
+    
+    def setUp(self):
+        _report_cache.clear()
+        self.addCleanup(_report_cache.clear)
+        
+        patcher = patch.object(trend_analyzer, "DatabaseManager")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        self.analyzer = TrendAnalyzer(use_mongodb=True)
+        self.articles = self.analyzer.db.articles_collection
+        self._set_articles(10, datetime(2024, 1, 1, 8, 0))
+        
+        # 只关心是否重新计算，报告内容用固定的简单结果代替
+        self.analyzer._collect_all = MagicMock(return_value=None)
+        self.analyzer._technology_trends_report = MagicMock(return_value={"total_articles": 10, "top_trends": []})
+        self.analyzer._author_activity_report = MagicMock(return_value={"total_authors": 1, "top_authors": []})
+        self.analyzer._publication_patterns_report = MagicMock(return_value={"daily_statistics": {"average": 1}})
+    
+    def _set_articles(self, count, latest_crawl_time):
+        self.articles.estimated_document_count.return_value = count
+        self.articles.find_one.return_value = {"crawl_time": latest_crawl_time}
+    
+    def test_unchanged_data_reuses_report(self):
+        first = self.analyzer.get_comprehensive_trends(30)
+        second = self.analyzer.get_comprehensive_trends(30)
+        
+        self.assertEqual(self.analyzer._collect_all.call_count, 1)
+        self.assertEqual(first, second)
+        # 返回的是副本，调用方修改不会影响缓存
+        self.assertIsNot(first, second)
+    
+    def test_new_article_changes_cache_key(self):
+        self.analyzer.get_comprehensive_trends(30)
+        self._set_articles(11, datetime(2024, 1, 2, 9, 30))
+        self.analyzer.get_comprehensive_trends(30)
+        
+        self.assertEqual(self.analyzer._collect_all.call_count, 2)
+        self.assertEqual(len(_report_cache), 2)
+    
+    def test_expired_ttl_forces_recompute(self):
+        with patch.object(trend_analyzer.time, "monotonic", return_value=1000.0):
+            self.analyzer.get_comprehensive_trends(30)
+        with patch.object(trend_analyzer.time, "monotonic", return_value=1000.0 + _REPORT_CACHE_TTL - 1):
+            self.analyzer.get_comprehensive_trends(30)
+        self.assertEqual(self.analyzer._collect_all.call_count, 1)
+        
+        with patch.object(trend_analyzer.time, "monotonic", return_value=1000.0 + _REPORT_CACHE_TTL + 1):
+            self.analyzer.get_comprehensive_trends(30)
+        self.assertEqual(self.analyzer._collect_all.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,6 +23,10 @@ class Settings(BaseSettings):
     max_retries: int = int(os.getenv("MAX_RETRIES", "3"))
     timeout: int = int(os.getenv("TIMEOUT", "30"))
     
+    # SQLite: maintain the articles_fts full-text index (larger database file,
+    # slower article writes; faster keyword growth analysis)
+    sqlite_fts: bool = os.getenv("SQLITE_FTS", "false").lower() == "true"
+    
     # Proxy settings
     use_proxy: bool = os.getenv("USE_PROXY", "false").lower() == "true"
     proxy_list_file: str = os.getenv("PROXY_LIST_FILE", "proxies.txt")
@@ -33,6 +37,10 @@ class Settings(BaseSettings):
     viewport_width: int = 375  # Mobile viewport
     viewport_height: int = 812
     user_agent: Optional[str] = None  # Will use default mobile UA if None
+    # Skip downloading images, fonts, media and stylesheets (crawlers only read the DOM)
+    block_resources: bool = os.getenv("BLOCK_RESOURCES", "true").lower() == "true"
+    # Default goto() timeout in seconds; discovery scrapes whatever has loaded by then
+    navigation_timeout: int = int(os.getenv("NAVIGATION_TIMEOUT", "5"))
     
     class Config:
         env_file = ".env"
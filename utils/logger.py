@@ -1,3 +1,4 @@
+import os
 import sys
 from loguru import logger
 from pathlib import Path
@@ -6,6 +7,10 @@ from pathlib import Path
 log_dir = Path(__file__).parent.parent / "logs"
 log_dir.mkdir(exist_ok=True)
 
+# DEBUG records are only written when DEBUG=true; otherwise loguru drops
+# them before formatting
+file_log_level = "DEBUG" if os.getenv("DEBUG", "false").lower() == "true" else "INFO"
+
 # Configure logger
 logger.remove()  # Remove default handler
 
@@ -21,7 +26,7 @@ logger.add(
 logger.add(
     log_dir / "wechat_crawler.log",
     format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-    level="DEBUG",
+    level=file_log_level,
     rotation="10 MB",
     retention="7 days",
     compression="zip"
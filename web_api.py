@@ -6,6 +6,7 @@ Web API for GeekDaily articles
 
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from typing import Optional, List, Dict, Any
 import uvicorn
 from datetime import datetime
@@ -578,11 +579,12 @@ async def evaluate_content_quality(
         if "error" in results:
             raise HTTPException(status_code=500, detail=results["error"])
         
-        return {
+        # 评估结果只包含 JSON 原生类型，直接序列化，跳过 jsonable_encoder 的逐层转换
+        return JSONResponse({
             "success": True,
             "data": results,
             "message": f"内容质量评估完成，评估了{results['summary']['successfully_evaluated']}篇文章"
-        }
+        })
         
     except HTTPException:
         raise
@@ -607,11 +609,11 @@ async def get_quality_insights(
         if "error" in results:
             raise HTTPException(status_code=500, detail=results["error"])
         
-        return {
+        return JSONResponse({
             "success": True,
             "data": results,
             "message": f"质量洞察报告生成完成（最低评分≥{min_score}）"
-        }
+        })
         
     except HTTPException:
         raise